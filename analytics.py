@@ -0,0 +1,154 @@
+"""
+Board difficulty analytics: 3BV, openings and islands of number cells, vectorized over stacks of boards
+
+Usage:
+    python analytics.py 30 16 99                          # 10000 seeded expert boards
+    python analytics.py 30 16 99 --boards 1000000         # a million boards over a process pool
+    python analytics.py 9 9 10 --seed 500 -o beginner.npz # per board results for seeds 500 and up
+
+Boards are generated like in the game, with the first reveal in the center unless --first is given.
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from board import placeMines
+from topology import countNeighbours
+
+# Cells analyzed per batch at most, bounds the memory of one worker
+BATCH_CELLS = 1 << 21
+# Batches per worker at least, so the workers stay busy until the end even if some batches take longer
+TASKS_PER_WORKER = 4
+METRICS = ("3bv", "openings", "islands", "lone_numbers")
+
+
+def labelComponents(mask: np.ndarray, reach: int = 1) -> np.ndarray:
+    """Labels the connected components of a boolean plane or a stack of planes
+
+    Cells within reach of each other (Chebyshev distance) are connected. Every cell of a component gets the flat index
+    of its first cell, cells outside the mask get -1. A vectorized union-find: every round hooks the larger of two
+    connected roots onto the smaller one and then compresses the paths, for all planes and edges at once.
+    """
+    height, width = mask.shape[-2:]
+    cells = np.arange(mask.size).reshape(mask.shape)
+    # Each pair of connected cells once, as the cell and its neighbour to the right or below
+    firsts = []
+    seconds = []
+    for dy in range(reach + 1):
+        for dx in range(-reach, reach + 1):
+            if dy == 0 and dx <= 0:
+                continue
+            left = max(-dx, 0)
+            right = width - max(dx, 0)
+            source = (Ellipsis, slice(0, height - dy), slice(left, right))
+            target = (Ellipsis, slice(dy, height), slice(left + dx, right + dx))
+            both = mask[source] & mask[target]
+            firsts.append(cells[source][both])
+            seconds.append(cells[target][both])
+    firsts = np.concatenate(firsts)
+    seconds = np.concatenate(seconds)
+    parent = cells.ravel().copy()
+    while True:
+        roots_first = parent[firsts]
+        roots_second = parent[seconds]
+        apart = roots_first != roots_second
+        if not apart.any():
+            break
+        # Pairs already joined stay joined
+        firsts = firsts[apart]
+        seconds = seconds[apart]
+        roots_first = roots_first[apart]
+        roots_second = roots_second[apart]
+        np.minimum.at(parent, np.maximum(roots_first, roots_second), np.minimum(roots_first, roots_second))
+        while True:
+            jumped = parent[parent]
+            if np.array_equal(jumped, parent):
+                break
+            parent = jumped
+    return np.where(mask, parent.reshape(mask.shape), -1)
+
+
+def countComponents(labels: np.ndarray) -> np.ndarray:
+    """Returns the amount of components per plane of labelComponents' labels"""
+    roots = labels == np.arange(labels.size).reshape(labels.shape)
+    return roots.sum(axis=(-2, -1))
+
+
+def analyze(mines: np.ndarray) -> dict:
+    """Returns the difficulty metrics of a bomb plane or a stack of bomb planes
+
+    openings are the empty regions as the game's cascade opens them: the numbers bordering an empty region also open
+    the empty cells next to them, so regions within two cells of each other open together. lone_numbers are the
+    number cells bordering no empty cell, each needs its own click, and islands are their 8-connected groups.
+    3bv is the least amount of clicks that clears the board, openings plus lone numbers.
+    """
+    counts = countNeighbours(mines)
+    empty = ~mines & (counts == 0)
+    openings = countComponents(labelComponents(empty, reach=2))
+    lone = ~mines & (countNeighbours(empty) == 0) & ~empty
+    lone_numbers = lone.sum(axis=(-2, -1))
+    islands = countComponents(labelComponents(lone))
+    return {"3bv": openings + lone_numbers, "openings": openings, "islands": islands, "lone_numbers": lone_numbers}
+
+
+def analyzeSeeds(width: int, height: int, bomb_count: int, seeds: range, first: "tuple[int, int]") -> np.ndarray:
+    """Pool task, returns the metrics of the boards of the seeds as (metric, board) rows"""
+    mines = np.empty((len(seeds), height, width), dtype=bool)
+    for i, seed in enumerate(seeds):
+        mines[i] = placeMines(width, height, bomb_count, seed, first)
+    metrics = analyze(mines)
+    return np.array([metrics[name] for name in METRICS], dtype=np.int32)
+
+
+def analyzeCorpus(width: int, height: int, bomb_count: int, boards: int, first_seed: int = 0,
+                  first: "tuple[int, int]" = None, workers: int = None) -> np.ndarray:
+    """Returns the metrics of the boards of consecutive seeds as (metric, board) rows, computed on a process pool"""
+    if first is None:
+        first = (width // 2, height // 2)
+    workers = workers or os.cpu_count() or 1
+    batch = max(min(BATCH_CELLS // (width*height), -(-boards // (TASKS_PER_WORKER*workers))), 1)
+    batches = [range(start, min(start + batch, first_seed + boards)) for start in range(first_seed, first_seed + boards, batch)]
+    if not batches:
+        return np.zeros((len(METRICS), 0), dtype=np.int32)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = pool.map(analyzeSeeds, *zip(*((width, height, bomb_count, seeds, first) for seeds in batches)))
+        return np.concatenate(list(results), axis=1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Minesweeper board difficulty analytics")
+    parser.add_argument("width", type=int)
+    parser.add_argument("height", type=int)
+    parser.add_argument("bombs", type=int)
+    parser.add_argument("--boards", type=int, default=10000, help="boards analyzed")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first board, the others follow")
+    parser.add_argument("--first", help="first revealed cell as x,y, the center by default")
+    parser.add_argument("--workers", type=int, default=None, help="pool processes, all cores by default")
+    parser.add_argument("-o", "--output", help="writes the seeds and the metrics of every board to this .npz")
+    args = parser.parse_args()
+
+    if args.boards < 1:
+        sys.exit("at least one board is needed")
+    if args.bombs > args.width*args.height - 1:
+        sys.exit("too many bombs for the board")
+    first = tuple(int(value) for value in args.first.split(",")) if args.first else None
+    start = time.perf_counter()
+    results = analyzeCorpus(args.width, args.height, args.bombs, args.boards, args.seed, first, args.workers)
+    elapsed = time.perf_counter() - start
+
+    print(f"{args.boards} boards {args.width}x{args.height} with {args.bombs} bombs in {elapsed:.1f} s "
+          f"({args.boards / elapsed:.0f} boards/s)")
+    print(f"{'':>14}{'mean':>9}{'std':>9}{'min':>7}{'p5':>7}{'p50':>7}{'p95':>7}{'max':>7}")
+    for name, values in zip(METRICS, results):
+        p5, p50, p95 = np.percentile(values, (5, 50, 95))
+        print(f"{name:>14}{values.mean():>9.2f}{values.std():>9.2f}{values.min():>7}{p5:>7.0f}{p50:>7.0f}{p95:>7.0f}"
+              f"{values.max():>7}")
+    if args.output:
+        np.savez_compressed(args.output, seeds=np.arange(args.seed, args.seed + args.boards, dtype=np.uint64),
+                            **dict(zip(METRICS, results)))
+
+
+if __name__ == "__main__":
+    main()
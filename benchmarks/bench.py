@@ -0,0 +1,206 @@
+"""
+Headless benchmarks for the game logic hot paths
+
+Usage:
+    python benchmarks/bench.py                       # runs and compares against benchmarks/baseline.json
+    python benchmarks/bench.py --save-baseline       # runs and stores the results as the new baseline
+    python benchmarks/bench.py --quick -o out.json   # smaller matrix, results written to out.json
+
+Exits with 1 if any benchmark got slower than the baseline by more than --threshold and by more than --floor
+milliseconds, so the timer noise of sub-millisecond benchmarks is not reported as a regression.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+# Kivy is only imported for the face computation of the renderer, no window is opened
+os.environ.setdefault("KIVY_NO_ARGS", "1")
+os.environ.setdefault("KIVY_NO_CONSOLELOG", "1")
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+from board import BoardModel, placeMines
+from boardview import cellFaces
+from probability import ProbabilityMap
+from replay import FLAG, REVEAL, GameRecorder, ReplayPlayer
+from solver import HintSolver
+
+SIZES = [(9, 9), (30, 16), (100, 100), (300, 300)]
+QUICK_SIZES = [(9, 9), (30, 16), (100, 100)]
+DENSITIES = [0.05, 0.12, 0.2]
+BASELINE = os.path.join(ROOT, "benchmarks", "baseline.json")
+
+
+def measure(function, setup=None, repeat: int = 15) -> dict:
+    """Times function repeatedly, setup runs untimed before every call and its result is passed on"""
+    timings = []
+    for _ in range(repeat):
+        argument = setup() if setup is not None else None
+        start = time.perf_counter()
+        function(argument)
+        timings.append((time.perf_counter() - start) * 1000)
+    return {"median_ms": statistics.median(timings), "min_ms": min(timings), "runs": repeat}
+
+
+def startedBoard(width: int, height: int, bomb_count: int, seed: int) -> BoardModel:
+    """Returns a Board Model after its first reveal in the center"""
+    model = BoardModel(width, height, bomb_count, seed)
+    model.reveal(width // 2, height // 2)
+    return model
+
+
+def playedBoard(width: int, height: int, bomb_count: int, seed: int, moves: int = 20) -> BoardModel:
+    """Returns a started Board Model played forward by the hint solver, leaving a mid-game frontier"""
+    model = BoardModel(width, height, bomb_count, seed)
+    solver = HintSolver(model)
+    solver.update(model.reveal(width // 2, height // 2))
+    for _ in range(moves):
+        safe, _ = solver.solve()
+        if not safe:
+            break
+        changed = set()
+        for x, y in sorted(safe)[:10]:
+            changed |= model.reveal(x, y)
+        solver.update(changed)
+    return model
+
+
+def chordSetup(width: int, height: int, bomb_count: int, seed: int):
+    """Returns a started Board Model and the cells that can be chorded after flagging their bombs"""
+    model = startedBoard(width, height, bomb_count, seed)
+    ys, xs = np.nonzero(model.revealed & (model.counts > 0))
+    cells = []
+    for x, y in zip(xs.tolist(), ys.tolist()):
+        if any(not model.revealed[ny, nx] and not model.mines[ny, nx] for nx, ny in model.neighbours(x, y)):
+            cells.append((x, y))
+    for x, y in cells:
+        for nx, ny in model.neighbours(x, y):
+            if model.mines[ny, nx] and not model.flags[ny, nx]:
+                model.flag(nx, ny)
+    return model, cells
+
+
+def chordAll(arguments):
+    """Chords every prepared cell"""
+    model, cells = arguments
+    for x, y in cells:
+        model.chord(x, y)
+
+
+def endGameReveal(model: BoardModel):
+    """Reveals the whole board and computes every face, like GameBoard.lose and GameBoard.win"""
+    model.revealAll()
+    everything = slice(None)
+    cellFaces(model, everything, everything)
+
+
+def recordGame(width: int, height: int, bomb_count: int, seed: int) -> str:
+    """Records a won game that flags every bomb and reveals every safe cell row by row, returns the replay path"""
+    model = startedBoard(width, height, bomb_count, seed)
+    handle, path = tempfile.mkstemp(suffix=".msr")
+    os.close(handle)
+    recorder = GameRecorder(path, model)
+    recorder.record(REVEAL, width // 2, height // 2)
+    for y in range(height):
+        for x in range(width):
+            if model.mines[y, x]:
+                recorder.record(FLAG, x, y)
+            elif not model.revealed[y, x]:
+                recorder.record(REVEAL, x, y)
+                model.reveal(x, y)
+    recorder.close()
+    return path
+
+
+def runSuite(sizes, repeat: int) -> dict:
+    """Runs every benchmark over the size and density matrix"""
+    results = {}
+    for width, height in sizes:
+        for density in DENSITIES:
+            bomb_count = max(int(width * height * density), 1)
+            seed = width * 1000 + height
+            name = f"{width}x{height}/{density}"
+            results[f"placement/{name}"] = measure(
+                lambda _: placeMines(width, height, bomb_count, seed, (width // 2, height // 2)), repeat=repeat)
+            results[f"first_click/{name}"] = measure(
+                lambda model: model.reveal(width // 2, height // 2),
+                lambda: BoardModel(width, height, bomb_count, seed), repeat=repeat)
+            results[f"chord/{name}"] = measure(
+                chordAll, lambda: chordSetup(width, height, bomb_count, seed), repeat=max(repeat // 3, 3))
+            results[f"end_reveal/{name}"] = measure(
+                endGameReveal, lambda: startedBoard(width, height, bomb_count, seed), repeat=repeat)
+            replay = recordGame(width, height, bomb_count, seed)
+            results[f"replay/{name}"] = measure(
+                lambda player: player.run(), lambda: ReplayPlayer(replay), repeat=max(repeat // 3, 3))
+            os.remove(replay)
+            played = playedBoard(width, height, bomb_count, seed)
+            results[f"heatmap/{name}"] = measure(
+                lambda heatmap: heatmap.compute(), lambda: ProbabilityMap(played), repeat=max(repeat // 3, 3))
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float, floor: float = 0.0) -> list:
+    """Prints every result next to its baseline and returns the names of the regressions, slower by floor ms at least"""
+    regressions = []
+    print(f"{'benchmark':<34}{'median ms':>12}{'baseline':>12}{'ratio':>8}")
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            print(f"{name:<34}{result['median_ms']:>12.3f}{'-':>12}{'-':>8}")
+            continue
+        ratio = result["median_ms"] / max(reference["median_ms"], 1e-6)
+        slower = result["median_ms"] - reference["median_ms"] > floor
+        flag = "  REGRESSION" if ratio > threshold and slower else ""
+        print(f"{name:<34}{result['median_ms']:>12.3f}{reference['median_ms']:>12.3f}{ratio:>8.2f}{flag}")
+        if flag:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless Minesweeper benchmarks")
+    parser.add_argument("-o", "--output", default="bench_results.json", help="machine-readable results file")
+    parser.add_argument("--baseline", default=BASELINE, help="baseline file to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="store the results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=1.5, help="slowdown ratio counted as a regression")
+    parser.add_argument("--floor", type=float, default=0.25, help="milliseconds a regression is slower by at least")
+    parser.add_argument("--repeat", type=int, default=15, help="timed runs per benchmark")
+    parser.add_argument("--quick", action="store_true", help="skip the largest boards")
+    args = parser.parse_args()
+
+    results = runSuite(QUICK_SIZES if args.quick else SIZES, args.repeat)
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "system": platform.system(),
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as file:
+        json.dump(report, file, indent=2)
+
+    regressions = []
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as file:
+            regressions = compare(results, json.load(file)["results"], args.threshold, args.floor)
+    else:
+        compare(results, {}, args.threshold)
+    if args.save_baseline:
+        with open(args.baseline, "w") as file:
+            json.dump(report, file, indent=2)
+    if regressions:
+        print(f"{len(regressions)} regression(s) over {args.threshold}x the baseline and {args.floor} ms slower")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
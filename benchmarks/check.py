@@ -0,0 +1,245 @@
+"""
+Headless correctness checks of the game logic against slow but obvious references
+
+Usage:
+    python benchmarks/check.py                        # every check
+    python benchmarks/check.py --check probability    # one check, can be repeated
+    python benchmarks/check.py --boards 500 --seed 7  # more random Boards, other ones
+
+probability  compares the Probability Map with the share of every consistent bomb placement, enumerated one by one
+history      plays random practice Games, undoes every move and redoes it, comparing Board Model and solver each step
+replay       records random Games, some resumed or cut off mid-record, and compares the replayed Boards with them
+
+Exits with 1 if any check fails, printing the Boards it failed on.
+"""
+import argparse
+import itertools
+import math
+import os
+import random
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+from board import BoardModel, placeMines
+from history import MoveHistory
+from probability import ProbabilityMap
+from replay import CHORD, FLAG, LAYOUT_MINES, LAYOUT_SEED, REVEAL, GameRecorder, ReplayPlayer, applyAction
+from solver import HintSolver
+
+TOPOLOGIES = ["square", "torus", "hex", "knight"]
+# Placements enumerated per Board at most, Boards with more are skipped
+MAX_PLACEMENTS = 200_000
+TOLERANCE = 1e-9
+
+
+def randomBoard(rng: random.Random, width: int, height: int) -> BoardModel:
+    """Returns a Board Model of random density and topology"""
+    bomb_count = rng.randint(1, width*height // 3)
+    return BoardModel(width, height, bomb_count, rng.getrandbits(32), rng.choice(TOPOLOGIES))
+
+
+def bruteForce(model: BoardModel) -> np.ndarray:
+    """Returns the share of the bomb placements agreeing with every revealed count that put a bomb on each cell"""
+    concealed = np.flatnonzero(~model.revealed)
+    revealed = np.flatnonzero(model.revealed)
+    topology = model.topology
+    # around[r, c]: concealed cell c touches revealed cell r
+    around = np.zeros((len(revealed), len(concealed)), dtype=np.int32)
+    column = {cell: c for c, cell in enumerate(concealed.tolist())}
+    for r, cell in enumerate(revealed.tolist()):
+        for neighbour in topology.indices[topology.indptr[cell]:topology.indptr[cell + 1]].tolist():
+            if neighbour in column:
+                around[r, column[neighbour]] = 1
+    counts = model.counts.reshape(-1)[revealed]
+    hits = np.zeros(len(concealed))
+    total = 0
+    placements = itertools.combinations(range(len(concealed)), model.bomb_count)
+    while True:
+        chunk = np.array(list(itertools.islice(placements, 4096)), dtype=np.int64)
+        if len(chunk) == 0:
+            break
+        bombs = np.zeros((len(chunk), len(concealed)), dtype=np.int32)
+        np.put_along_axis(bombs, chunk.reshape(len(chunk), -1), 1, axis=1)
+        consistent = bombs[(bombs @ around.T == counts).all(axis=1)]
+        hits += consistent.sum(axis=0)
+        total += len(consistent)
+    probabilities = np.full(model.width*model.height, np.nan)
+    probabilities[concealed] = hits / total
+    return probabilities.reshape(model.revealed.shape)
+
+
+def checkProbability(rng: random.Random, boards: int) -> list:
+    """Returns the Boards on which the Probability Map differs from the enumerated placements"""
+    failures = []
+    checked = 0
+    while checked < boards:
+        model = randomBoard(rng, rng.randint(3, 7), rng.randint(3, 7))
+        model.reveal(rng.randrange(model.width), rng.randrange(model.height))
+        for _ in range(rng.randint(0, 3)):
+            ys, xs = np.nonzero(~model.revealed & ~model.mines)
+            if len(xs) == 0:
+                break
+            i = rng.randrange(len(xs))
+            model.reveal(int(xs[i]), int(ys[i]))
+        concealed = int((~model.revealed).sum())
+        if model.won or math.comb(concealed, model.bomb_count) > MAX_PLACEMENTS:
+            continue
+        checked += 1
+        expected = bruteForce(model)
+        actual = ProbabilityMap(model).compute()
+        if not np.array_equal(np.isnan(expected), np.isnan(actual)):
+            failures.append(f"{model.topology_name} {model.width}x{model.height}/{model.bomb_count} "
+                            f"seed {model.seed}: revealed cells differ")
+            continue
+        difference = float(np.nanmax(np.abs(expected - actual)))
+        if difference > TOLERANCE:
+            failures.append(f"{model.topology_name} {model.width}x{model.height}/{model.bomb_count} "
+                            f"seed {model.seed}: off by {difference:.3g}")
+    return failures
+
+
+def playMove(rng: random.Random, model: BoardModel) -> tuple:
+    """Returns a random (action, x, y), mostly reveals of safe cells so the Games last a while"""
+    action = rng.choice([REVEAL, REVEAL, FLAG, CHORD])
+    if action == REVEAL and rng.random() < 0.95:
+        ys, xs = np.nonzero(~model.revealed & ~model.mines & ~model.flags)
+        if len(xs):
+            i = rng.randrange(len(xs))
+            return action, int(xs[i]), int(ys[i])
+    return action, rng.randrange(model.width), rng.randrange(model.height)
+
+
+def gameState(model: BoardModel, solver: HintSolver) -> tuple:
+    """Returns copies of everything an undo restores and the deductions of the solver about concealed cells"""
+    safe, mines = solver.solve()
+    # Bombs stay deduced once revealed by the Game Over, those are never hinted
+    mines = [(x, y) for x, y in mines if not model.revealed[y, x]]
+    return (model.revealed.copy(), model.flags.copy(), bytes(model._blocked), model.progress, model.flags_remaining,
+            model.lost, model.first_reveal, sorted(safe), sorted(mines))
+
+
+def sameState(a: tuple, b: tuple) -> bool:
+    """Returns if two game states are equal"""
+    return all(np.array_equal(x, y) if isinstance(x, np.ndarray) else x == y for x, y in zip(a, b))
+
+
+def checkHistory(rng: random.Random, boards: int) -> list:
+    """Returns the Games whose state differs after undoing or redoing a move from when the move was first played"""
+    failures = []
+    for _ in range(boards):
+        model = randomBoard(rng, rng.randint(3, 30), rng.randint(3, 30))
+        solver = HintSolver(model)
+        history = MoveHistory(model, solver, checkpoint_interval=rng.randint(1, 8))
+        history.reset()
+        name = f"{model.topology_name} {model.width}x{model.height}/{model.bomb_count} seed {model.seed}"
+        # Like a tap, every action is committed as a move before the next one
+        states = []
+        for _ in range(rng.randint(1, 60)):
+            action, x, y = playMove(rng, model)
+            changed = applyAction(model, action, x, y)
+            if model.lost:
+                # The Game Over reveal is part of the move, so a redo hands its cells to the solver as well
+                ys, xs = np.nonzero(~model.revealed)
+                changed |= set(zip(xs.tolist(), ys.tolist()))
+                model.revealAll()
+            solver.update(changed)
+            history.commit()
+            if history.position > len(states):
+                states.append(gameState(model, solver))
+            if model.lost or model.won:
+                break
+        # The first reveal and the flags before it are never undone
+        fixed = sum(move.before[3] for move in history.moves)
+        for position in range(len(states) - 1, fixed - 1, -1):
+            if history.undo() is None or not sameState(gameState(model, solver), states[position - 1]):
+                failures.append(f"{name}: undo to move {position} differs")
+                break
+        else:
+            if history.undo() is not None:
+                failures.append(f"{name}: the first reveal was undone")
+            for position in range(fixed, len(states)):
+                if history.redo() is None or not sameState(gameState(model, solver), states[position]):
+                    failures.append(f"{name}: redo of move {position + 1} differs")
+                    break
+            else:
+                if history.redo() is not None:
+                    failures.append(f"{name}: redid a move never played")
+    return failures
+
+
+def boardState(model: BoardModel) -> tuple:
+    """Returns copies of everything a replay has to reproduce"""
+    return (model.mines.copy(), model.revealed.copy(), model.flags.copy(), model.progress, model.flags_remaining,
+            model.lost)
+
+
+def checkReplay(rng: random.Random, boards: int) -> list:
+    """Returns the Games whose replay ends on another Board than the recorded Game"""
+    failures = []
+    with tempfile.TemporaryDirectory() as directory:
+        for game in range(boards):
+            model = randomBoard(rng, rng.randint(3, 30), rng.randint(3, 30))
+            layout = rng.choice([LAYOUT_SEED, LAYOUT_MINES])
+            if layout == LAYOUT_MINES:
+                model.setMines(placeMines(model.width, model.height, model.bomb_count, model.seed, None, model.topology))
+                model.first_reveal = False
+            name = f"{model.topology_name} {model.width}x{model.height}/{model.bomb_count} seed {model.seed}"
+            path = os.path.join(directory, f"{game}.msr")
+            recorder = GameRecorder(path, model, layout)
+            # states[n]: the Board after the first n actions
+            states = [boardState(model)]
+            resume = rng.randint(0, 60)
+            for moves in range(rng.randint(1, 60)):
+                if moves == resume:
+                    # Like a restored snapshot, the recording goes on in the same file
+                    recorder.close()
+                    recorder = GameRecorder(path, model, layout, resume=True)
+                action, x, y = playMove(rng, model)
+                recorder.record(action, x, y)
+                applyAction(model, action, x, y)
+                states.append(boardState(model))
+                if model.lost or model.won:
+                    break
+            recorder.close()
+            actions = len(states) - 1
+            if rng.random() < 0.25:
+                # A Game killed while writing leaves part of a record, the replay stops before it
+                with open(path, "r+b") as file:
+                    file.truncate(os.path.getsize(path) - rng.randint(1, 3))
+                actions -= 1
+            player = ReplayPlayer(path)
+            replayed = boardState(player.run())
+            if len(player.records) != actions:
+                failures.append(f"{name}: {actions} complete actions recorded, {len(player.records)} read")
+            elif not sameState(replayed, states[actions]):
+                failures.append(f"{name}: the replay of {actions} actions differs")
+    return failures
+
+
+CHECKS = {"probability": checkProbability, "history": checkHistory, "replay": checkReplay}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless Minesweeper correctness checks")
+    parser.add_argument("--check", action="append", choices=list(CHECKS), help="check to run, can be repeated")
+    parser.add_argument("--boards", type=int, default=200, help="random Boards per check")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the random Boards")
+    args = parser.parse_args()
+
+    failed = False
+    for name in args.check or CHECKS:
+        failures = CHECKS[name](random.Random(args.seed), args.boards)
+        print(f"{name:<14}{args.boards} Boards, {len(failures)} failed")
+        for failure in failures:
+            print(f"  {failure}")
+        failed = failed or bool(failures)
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Frame report: frame times while a large reveal is computed, drawn and uploaded
+
+Usage:
+    python benchmarks/frames.py                           # 200x200 with 2000 bombs and 500x500 with 10000 bombs
+    python benchmarks/frames.py --board 100x100/2000      # other boards
+    python benchmarks/frames.py --limit 16                # milliseconds a frame may keep the main thread busy
+
+Every board runs in a fresh process and opens a window, SDL_VIDEODRIVER=offscreen works headless. The busy time of a
+frame is everything the main thread does in it apart from waiting for the next frame: the Clock callbacks, the
+uploads and drawing the canvas. Every frame waits for OpenGL to finish it, so its rendering is counted in the frame that
+caused it and not in the next upload that waits for it. The redraw column is the busy time of drawing the unchanged window, the floor of every
+frame: with software OpenGL it alone can take longer than a frame.
+Exits with 1 if any frame of the move kept the main thread busy for longer than --limit.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BOARDS = ["200x200/2000", "500x500/10000"]
+
+
+def timedMove(width: int, height: int, bomb_count: int) -> dict:
+    """Taps the center of a new Board in a fresh process, returns the frame and busy times until the move is drawn"""
+    script = f"""
+import json, os, sys, time
+os.environ["KIVY_NO_ARGS"] = "1"
+os.environ["KIVY_NO_CONSOLELOG"] = "1"
+sys.path.insert(0, os.getcwd())
+import main
+from kivy.base import EventLoop
+from kivy.clock import Clock
+from kivy.core.window import Window
+from kivy.graphics.opengl import glFinish
+busy = []
+redraws = []
+flips = []
+waited = [0.0]
+flipped = [False]
+
+def timedIdle(idle):
+    def wrapper():
+        start = time.perf_counter()
+        result = idle()
+        waited[0] += time.perf_counter() - start
+        return result
+    return wrapper
+
+def timedLoop(loop_idle):
+    def wrapper():
+        waited[0] = 0.0
+        flipped[0] = False
+        start = time.perf_counter()
+        result = loop_idle()
+        # only frames that drew the window, the others just waited for input
+        if flipped[0]:
+            busy.append(time.perf_counter() - start - waited[0])
+        return result
+    return wrapper
+
+def onFlip(window):
+    glFinish()
+    flipped[0] = True
+    flips.append(time.perf_counter())
+
+def startGame(dt):
+    app.root.startGame("{width}", "{height}", "{bomb_count}")
+    # the board is laid out and drawn before the redraws are timed
+    Clock.schedule_once(lambda dt: redraw(app.root.game_board, 5), 1.0)
+
+def redraw(board, count):
+    redraws.extend(busy)
+    busy.clear()
+    if count == 0:
+        redraws.pop(0)
+        tap()
+        return
+    board.canvas.ask_update()
+    Clock.schedule_once(lambda dt: redraw(board, count - 1), 0)
+
+def tap():
+    board = app.root.game_board
+    flips.clear()
+    busy.clear()
+    started = time.perf_counter()
+    board.dispatch("on_cell_release", {width} // 2, {height} // 2)
+    Clock.schedule_interval(lambda dt: waitForMove(board, started), 0)
+
+def waitForMove(board, started):
+    if board.isBusy() or board.flush_event is not None:
+        return
+    duration = time.perf_counter() - started
+    intervals = [b - a for a, b in zip(flips, flips[1:])]
+    print(json.dumps({{"move_s": duration, "frame_ms": [i * 1000 for i in intervals], "busy_ms": [b * 1000 for b in busy],
+                      "redraw_ms": [r * 1000 for r in redraws]}}))
+    sys.stdout.flush()
+    os._exit(0)
+
+def onStart(app):
+    Clock.idle = timedIdle(Clock.idle)
+    EventLoop.idle = timedLoop(EventLoop.idle)
+    Window.bind(on_flip = onFlip)
+    Clock.schedule_once(startGame, 0.5)
+
+app = main.MinesweeperApp()
+app.bind(on_start = onStart)
+app.run()
+"""
+    result = subprocess.run([sys.executable, "-c", script], cwd=ROOT, capture_output=True, text=True, timeout=300)
+    if result.returncode != 0:
+        sys.exit(f"app run failed:\n{result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def percentile(values: list, fraction: float) -> float:
+    """Returns the value below which the fraction of the sorted values lies"""
+    ordered = sorted(values)
+    return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Frame times of a large reveal")
+    parser.add_argument("--board", action="append", help="WIDTHxHEIGHT/BOMBS, can be repeated")
+    parser.add_argument("--limit", type=float, default=16.0, help="milliseconds a frame may keep the main thread busy")
+    args = parser.parse_args()
+
+    over = 0
+    print(f"{'board':<16}{'redraw':>8}{'move s':>8}{'frames':>8}{'frame p50':>11}{'p95':>8}{'max':>8}"
+          f"{'busy p50':>10}{'p95':>8}{'max':>8}")
+    for board in args.board or BOARDS:
+        size, bomb_count = board.split("/")
+        width, height = size.split("x")
+        times = timedMove(int(width), int(height), int(bomb_count))
+        frames = times["frame_ms"] or [0.0]
+        busy = times["busy_ms"] or [0.0]
+        redraw = times["redraw_ms"] or [0.0]
+        over += sum(1 for value in busy if value > args.limit)
+        print(f"{board:<16}{percentile(redraw, 0.5):>8.1f}{times['move_s']:>8.2f}{len(frames):>8}{percentile(frames, 0.5):>11.1f}"
+              f"{percentile(frames, 0.95):>8.1f}{max(frames):>8.1f}{percentile(busy, 0.5):>10.1f}"
+              f"{percentile(busy, 0.95):>8.1f}{max(busy):>8.1f}")
+    if over:
+        print(f"{over} frame(s) kept the main thread busy for more than {args.limit} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
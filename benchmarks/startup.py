@@ -0,0 +1,109 @@
+"""
+Startup report: import times of the app modules, time to the drawn menu, to the end of the preloading and to the
+first board
+
+Usage:
+    python benchmarks/startup.py              # import report and one timed app start
+    python benchmarks/startup.py --runs 5     # median over five app starts
+    python benchmarks/startup.py --top 40     # longer import report
+
+Each app start runs in a fresh process and opens a window, SDL_VIDEODRIVER=offscreen works headless. The menu is drawn
+before the Game Popup is built on the main thread, a tap is only handled once ready_ms have passed.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def importReport(top: int):
+    """Prints the slowest imports of main.py as measured by python -X importtime"""
+    environment = dict(os.environ, KIVY_NO_ARGS="1", KIVY_NO_CONSOLELOG="1")
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"],
+                            cwd=ROOT, env=environment, capture_output=True, text=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_time, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((int(cumulative), int(self_time), depth, name.strip()))
+    total = next((cumulative for cumulative, _, _, name in rows if name == "main"), 0)
+    print(f"import main: {total / 1000:.1f} ms")
+    print(f"{'cumulative ms':>14}{'self ms':>10}  module")
+    for cumulative, self_time, depth, name in sorted(rows, reverse=True)[:top]:
+        print(f"{cumulative / 1000:>14.1f}{self_time / 1000:>10.1f}  {'  ' * depth}{name}")
+
+
+def timedStart() -> dict:
+    """Starts the app in a fresh process, returns the milliseconds until the menu is drawn, the preloading is done and
+    the first board is drawn"""
+    script = """
+import json, os, sys, time
+started = time.perf_counter()
+os.environ["KIVY_NO_ARGS"] = "1"
+os.environ["KIVY_NO_CONSOLELOG"] = "1"
+sys.path.insert(0, os.getcwd())
+import main
+from kivy.clock import Clock
+times = {}
+
+def menuShown(dt):
+    times["menu_ms"] = (time.perf_counter() - started) * 1000
+
+# the preloading ends with building the Game Popup on the main thread
+prepareGame = main.MainMenu.prepareGame
+
+def timedPrepareGame(menu):
+    prepareGame(menu)
+    times["ready_ms"] = (time.perf_counter() - started) * 1000
+    # the user reads the menu for a moment, as after a real start
+    Clock.schedule_once(startGame, 1.0)
+
+main.MainMenu.prepareGame = timedPrepareGame
+
+def startGame(dt):
+    clicked = time.perf_counter()
+    app.root.startGame("30", "16", "99")
+    Clock.schedule_once(lambda dt: boardShown(clicked), 0)
+
+def boardShown(clicked):
+    times["first_board_ms"] = (time.perf_counter() - clicked) * 1000
+    print(json.dumps(times))
+    sys.stdout.flush()
+    os._exit(0)
+
+def onStart(app):
+    # callbacks scheduled on start run before the first frame is drawn, the ones they schedule after it
+    Clock.schedule_once(lambda dt: Clock.schedule_once(menuShown, 0), 0)
+
+app = main.MinesweeperApp()
+app.bind(on_start = onStart)
+app.run()
+"""
+    result = subprocess.run([sys.executable, "-c", script], cwd=ROOT, capture_output=True, text=True, timeout=120)
+    if result.returncode != 0:
+        sys.exit(f"app start failed:\n{result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Minesweeper startup report")
+    parser.add_argument("--runs", type=int, default=1, help="timed app starts")
+    parser.add_argument("--top", type=int, default=25, help="imports listed in the report")
+    args = parser.parse_args()
+
+    importReport(args.top)
+    runs = [timedStart() for _ in range(args.runs)]
+    print()
+    for key in ("menu_ms", "ready_ms", "first_board_ms"):
+        values = [run[key] for run in runs]
+        print(f"{key}: median {statistics.median(values):.1f}  min {min(values):.1f}  max {max(values):.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+import random
+import numpy as np
+from topology import Topology, getTopology
+
+
+def placeMines(width: int, height: int, bomb_count: int, seed: int, safe: "tuple[int, int]" = None,
+               topology: Topology = None) -> np.ndarray:
+    """Samples exactly bomb_count bomb positions in one pass, keeping the safe cell and if possible its neighbours free"""
+    allowed = np.ones((height, width), dtype=bool)
+    if safe is not None:
+        x, y = safe
+        if topology is None:
+            # The square neighbourhood is the 3x3 block around the cell, cheaper than building the whole table for it
+            zone = [(nx, ny) for ny in range(max(y - 1, 0), min(y + 2, height))
+                    for nx in range(max(x - 1, 0), min(x + 2, width)) if (nx, ny) != (x, y)]
+        else:
+            zone = topology.neighbours(x, y)
+        allowed[y, x] = False
+        # Falls back to only keeping the safe cell free if the board is too dense for the whole neighbourhood
+        if width*height - len(zone) - 1 >= bomb_count:
+            for nx, ny in zone:
+                allowed[ny, nx] = False
+    candidates = np.flatnonzero(allowed)
+    chosen = np.random.default_rng(seed).choice(candidates, size=bomb_count, replace=False)
+    mines = np.zeros(width*height, dtype=bool)
+    mines[chosen] = True
+    return mines.reshape((height, width))
+
+
+class BoardModel:
+    """Headless Minesweeper Board, holds the mine, flag and revealed planes"""
+    def __init__(self, width: int, height: int, bomb_count: int, seed: int = None, topology: str = "square"):
+        """Board Model init, topology names the neighbourhood of the cells (see topology.TOPOLOGIES)"""
+        self.width = width
+        self.height = height
+        self.init_bomb_count = bomb_count
+        self.topology_name = topology
+        self.mines = None
+        # ([revealed cells], [toggled flags]) as flat indices while a Move History listens, see history.py
+        self.journal = None
+        self.reset(seed)
+
+    def reset(self, seed: int = None):
+        """Clears all bombs, flags and revealed cells. The bombs are placed on the first reveal"""
+        width = self.width
+        height = self.height
+        bomb_count = self.init_bomb_count
+
+        # Adjusts bomb count if ist less than zero or more than the amount of cells besides the first revealed one
+        if bomb_count < 0:
+            bomb_count = 0
+        if bomb_count > width*height - 1:
+            bomb_count = width*height - 1
+        self.bomb_count = bomb_count
+        self.progress = bomb_count
+        self.flags_remaining = bomb_count
+        self.first_reveal = True
+        self.lost = False
+
+        self.seed = seed if seed is not None else random.getrandbits(64)
+        self.topology = getTopology(self.topology_name, width, height)
+        # Clears the planes in place when the board keeps its size
+        if self.mines is not None and self.mines.shape == (height, width):
+            self.flags.fill(False)
+            self.revealed.fill(False)
+            self.mines.fill(False)
+            self.setMines(self.mines)
+        else:
+            self.flags = np.zeros((height, width), dtype=bool)
+            self.revealed = np.zeros((height, width), dtype=bool)
+            self.setMines(np.zeros((height, width), dtype=bool))
+
+    def setMines(self, mines: np.ndarray, counts: np.ndarray = None):
+        """Sets the bomb plane and the adjacency counts, which are computed unless given"""
+        self.mines = mines
+        self.counts = counts if counts is not None else self.topology.count(mines)
+        self._flat_counts = self.counts.ravel().tolist()
+        # Cells a cascade never floods into (flagged, revealed or bomb) by flat index.
+        # Kept up to date by flag and cascade, so no move has to scan the whole board
+        self._blocked = bytearray((self.revealed | self.flags | mines).tobytes())
+
+    @property
+    def won(self) -> bool:
+        """Returns if every bomb and no other cell is flagged"""
+        return self.progress == 0 and not self.lost
+
+    def neighbours(self, x: int, y: int):
+        """Returns the (x, y) indices around a cell, without the cell itself"""
+        return self.topology.neighbours(x, y)
+
+    def flagCount(self, x: int, y: int) -> int:
+        """Returns the amount of flagged cells around a cell"""
+        return self.topology.countAround(self.flags, x, y)
+
+    def reveal(self, x: int, y: int) -> set:
+        """Reveals a cell, cascading over empty regions. Returns the changed cells"""
+        if self.lost:
+            return set()
+        if self.first_reveal:
+            # The first revealed cell and its neighbours are never bombs
+            self.setMines(placeMines(self.width, self.height, self.bomb_count, self.seed, (x, y), self.topology))
+            self.first_reveal = False
+        return self.cascade([(x, y)])
+
+    def flag(self, x: int, y: int) -> set:
+        """Toggles the flag of a concealed cell. Returns the changed cells"""
+        if self.lost or self.revealed[y, x]:
+            return set()
+        is_bomb = bool(self.mines[y, x])
+        i = y*self.width + x
+        if self.flags[y, x]:
+            self.flags[y, x] = False
+            self._blocked[i] = is_bomb
+            self.flags_remaining += 1
+            self.progress += 1 if is_bomb else -1
+        else:
+            self.flags[y, x] = True
+            self._blocked[i] = 1
+            self.flags_remaining -= 1
+            self.progress -= 1 if is_bomb else -1
+        if self.journal is not None:
+            self.journal[1].append(i)
+        return {(x, y)}
+
+    def chord(self, x: int, y: int) -> set:
+        """Reveals all unflagged neighbours of a revealed cell whose bombs are all flagged. Returns the changed cells"""
+        if self.lost or not self.revealed[y, x] or self.flagCount(x, y) != self.counts[y, x]:
+            return set()
+        return self.cascade(self.neighbours(x, y))
+
+    def revealAll(self):
+        """Reveals the whole board at game end"""
+        if self.journal is not None:
+            self.journal[0].append(np.flatnonzero(~self.revealed))
+        self.revealed.fill(True)
+        self._blocked = bytearray(b"\x01"*len(self._blocked))
+
+    def syncBlocked(self, cells: np.ndarray):
+        """Updates the cascade buffer of flat cells whose planes were set directly, e.g. by an undo"""
+        blocked = np.frombuffer(self._blocked, dtype=np.uint8)
+        blocked[cells] = (self.revealed.reshape(-1)[cells] | self.flags.reshape(-1)[cells]
+                          | self.mines.reshape(-1)[cells])
+
+    def cascade(self, seeds) -> set:
+        """Reveals the seed cells and floods the orthogonal Cells with an explicit stack. Returns the revealed cells"""
+        # The neighbours of cell i are neighbours[starts[i]:starts[i + 1]] of the Topology's table
+        width = self.width
+        starts = self.topology.starts
+        neighbours = self.topology.flat
+        counts = self._flat_counts
+        # every cell is pushed at most once, pushed cells end up revealed and stay blocked
+        blocked = self._blocked
+        changed = set()
+        stack = []
+        for x, y in seeds:
+            i = y*width + x
+            if not blocked[i]:
+                blocked[i] = 1
+                stack.append(i)
+            elif self.mines[y, x] and not self.flags[y, x] and not self.revealed[y, x]:
+                self.lost = True
+                self.revealed[y, x] = True
+                changed.add((x, y))
+                if self.journal is not None:
+                    self.journal[0].append([i])
+
+        region = []
+        while stack:
+            i = stack.pop()
+            region.append(i)
+            if counts[i] == 0:
+                for j in neighbours[starts[i]:starts[i + 1]]:
+                    if not blocked[j]:
+                        blocked[j] = 1
+                        stack.append(j)
+            else:
+                for j in neighbours[starts[i]:starts[i + 1]]:
+                    if not blocked[j] and counts[j] == 0:
+                        blocked[j] = 1
+                        stack.append(j)
+
+        if self.journal is not None:
+            self.journal[0].append(region)
+        if len(region) < 32:
+            # Most moves reveal a handful of cells, where numpy's per call overhead dominates
+            revealed = self.revealed
+            for i in region:
+                y, x = divmod(i, width)
+                revealed[y, x] = True
+                changed.add((x, y))
+            return changed
+        region = np.array(region, dtype=np.intp)
+        ys = region // width
+        xs = region % width
+        self.revealed[ys, xs] = True
+        changed.update(zip(xs.tolist(), ys.tolist()))
+        return changed
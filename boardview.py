@@ -0,0 +1,551 @@
+from collections import OrderedDict
+import time
+import numpy as np
+from kivy.clock import Clock
+from kivy.core.text import Label as CoreLabel
+from kivy.graphics import (BorderImage, ClearBuffers, ClearColor, Color, Fbo, InstructionGroup, Line, Mesh, PopMatrix,
+                           PushMatrix, Rectangle, Scale, ScissorPop, ScissorPush, Translate)
+from kivy.graphics.texture import Texture
+from kivy.vector import Vector
+from kivy.uix.widget import Widget
+from board import BoardModel
+
+shovel_icon = ""
+flag_icon = ""
+flag_color = (1, 0, 0, 1)
+bomb_icon = ""
+bomb_color = (0, 0, 0, 1)
+one_color = (0, 0, 1, 1)
+two_color = (0, 0.5, 0, 1)
+three_color = (1, 0, 0, 1)
+four_color = (0, 0, 0.5, 1)
+five_color = (0.5, 0, 0, 1)
+six_color = (0, 0.5, 0.5, 1)
+seven_color = (0, 0, 0, 1)
+eight_color = (0.5, 0.5, 0.5, 1)
+wrong_flag_color = (0, 0, 0, 1)
+
+roboto_font = "data/fonts/Roboto-Regular.ttf"
+icon_font = "celltext.ttf"
+
+# Faces 0-8 are revealed cells showing their bomb count
+FACE_CONCEALED = 9
+FACE_FLAG = 10
+FACE_BOMB = 11
+FACE_WRONG_FLAG = 12
+FACE_COUNT = 13
+
+# text, font, color and background of every face
+face_styles = [
+    ("", roboto_font, (0, 0, 0, 1), "down.png"),
+    ("1", roboto_font, one_color, "down.png"),
+    ("2", roboto_font, two_color, "down.png"),
+    ("3", roboto_font, three_color, "down.png"),
+    ("4", roboto_font, four_color, "down.png"),
+    ("5", roboto_font, five_color, "down.png"),
+    ("6", roboto_font, six_color, "down.png"),
+    ("7", roboto_font, seven_color, "down.png"),
+    ("8", roboto_font, eight_color, "down.png"),
+    ("", icon_font, (0, 0, 0, 1), "normal.png"),
+    (flag_icon, icon_font, flag_color, "normal.png"),
+    (bomb_icon, icon_font, bomb_color, "normal.png"),
+    (flag_icon, icon_font, wrong_flag_color, "down.png"),
+]
+
+# Tiles are rendered at the pixel size of the cells, TILE_SIZE until the Board is laid out
+TILE_SIZE = 64
+MIN_TILE_SIZE = 8
+MAX_TILE_SIZE = 256
+# Atlases by tile size, shared by every Board View. Only a few are kept, as every one holds a texture
+ATLAS_CACHE_SIZE = 4
+atlas_cache = OrderedDict()
+# Zoomed out below this many pixels per cell the Board is drawn from the minimap, one pixel per cell
+MINIMAP_CELL_SIZE = 4
+# Pixels per cell the view zooms in to at most
+MAX_ZOOM_CELL_SIZE = 96
+# Pixels a touch moves before it pans instead of tapping
+PAN_DISTANCE = 10
+# Mesh indices are unsigned shorts, so one Mesh can hold at most 65536 vertices
+MAX_MESH_CELLS = 65536 // 4
+QUAD_INDICES = np.array([0, 1, 2, 2, 3, 0], dtype=np.uint16)
+# Seconds between two uploads of changed cells at least, the rows changed meanwhile are uploaded together
+UPLOAD_INTERVAL = 1 / 30
+
+
+def buildAtlas(tile_size: int) -> Fbo:
+    """Renders every face once into one row of tiles, the texture of the returned Fbo is the atlas"""
+    fbo = Fbo(size=(tile_size*FACE_COUNT, tile_size))
+    # Small tiles keep a quarter of their size for the bevel instead of the 16 pixels of the background images
+    border = min(16, tile_size // 4)
+    # and a larger share for the text, which would be unreadable at 40 percent
+    font_size = max(tile_size*0.4, min(tile_size*0.75, 10))
+    with fbo:
+        ClearColor(0, 0, 0, 0)
+        ClearBuffers()
+        for face, (text, font, color, background) in enumerate(face_styles):
+            Color(1, 1, 1, 1)
+            BorderImage(source=background, pos=(face*tile_size, 0), size=(tile_size, tile_size), border=(border,)*4)
+            if text:
+                label = CoreLabel(text=text, font_name=font, font_size=font_size)
+                label.refresh()
+                texture = label.texture
+                Color(*color)
+                Rectangle(texture=texture, size=texture.size,
+                          pos=(face*tile_size + (tile_size - texture.width) // 2, (tile_size - texture.height) // 2))
+    fbo.draw()
+    return fbo
+
+
+def faceCoordinates(tile_size: int, atlas_width: int) -> np.ndarray:
+    """Returns the left and right texture coordinate of every face in the atlas"""
+    faces = np.arange(FACE_COUNT, dtype=np.float32)
+    # Insets the tiles by half a texel so neighbouring faces never bleed in
+    left = (faces*tile_size + 0.5) / atlas_width
+    right = ((faces + 1)*tile_size - 0.5) / atlas_width
+    return np.stack((left, right), axis=1)
+
+
+def getAtlas(tile_size: int):
+    """Returns the atlas Fbo and face coordinates for a tile size, rendering them only if they are not cached"""
+    cached = atlas_cache.get(tile_size)
+    if cached is not None:
+        atlas_cache.move_to_end(tile_size)
+        return cached
+    atlas = buildAtlas(tile_size)
+    cached = atlas_cache[tile_size] = (atlas, faceCoordinates(tile_size, atlas.texture.width))
+    if len(atlas_cache) > ATLAS_CACHE_SIZE:
+        atlas_cache.popitem(last=False)
+    return cached
+
+
+def minimapColors() -> np.ndarray:
+    """Returns the RGBA minimap pixel of every face: its background shade tinted by the color of its text"""
+    colors = np.zeros((FACE_COUNT, 4), dtype=np.uint8)
+    for face, (text, font, color, background) in enumerate(face_styles):
+        shade = np.array([205, 205, 205] if background == "down.png" else [150, 150, 150], dtype=np.float32)
+        if text:
+            shade = 0.4*shade + 0.6*255*np.array(color[:3], dtype=np.float32)
+        colors[face, :3] = shade
+        colors[face, 3] = 255
+    return colors
+
+
+minimap_colors = minimapColors()
+
+
+def tileSize(cell_size: float) -> int:
+    """Returns the tile size matching a cell size in pixels"""
+    return min(max(int(round(cell_size)), MIN_TILE_SIZE), MAX_TILE_SIZE)
+
+
+def cellFaces(model: BoardModel, ys, xs) -> np.ndarray:
+    """Returns the face of the given cells based on the Board Model state, ys and xs may also be slices"""
+    revealed = model.revealed[ys, xs]
+    mines = model.mines[ys, xs]
+    flags = model.flags[ys, xs]
+    faces = np.where(revealed, model.counts[ys, xs], FACE_CONCEALED)
+    faces[flags & (mines | ~revealed)] = FACE_FLAG
+    faces[revealed & mines & ~flags] = FACE_BOMB
+    # Only happens at game end, when the whole board is revealed
+    faces[revealed & flags & ~mines] = FACE_WRONG_FLAG
+    return faces
+
+
+def heatmapColors(probabilities: np.ndarray) -> np.ndarray:
+    """Maps bomb probabilities to translucent green to red RGBA pixels, NaN cells stay transparent"""
+    known = ~np.isnan(probabilities)
+    p = np.nan_to_num(probabilities)
+    colors = np.zeros(probabilities.shape + (4,), dtype=np.uint8)
+    colors[..., 0] = (255*p).astype(np.uint8)
+    colors[..., 1] = (255*(1 - p)).astype(np.uint8)
+    colors[..., 3] = np.where(known, 120, 0)
+    return colors
+
+
+class BoardView(Widget):
+    """Draws every cell of a Board Model on one canvas and hit-tests touches arithmetically
+
+    The view can be zoomed and panned, which only changes a transform on the canvas. Zoomed far out, the cells are
+    drawn from a minimap texture with one pixel per cell instead of the meshes.
+    """
+    __events__ = ("on_cell_release",)
+    # Pans with one finger and zooms with two or the mouse wheel, otherwise a drag only taps if it stays on its cell
+    zoomable = False
+
+    def __init__(self, model: BoardModel, **kwargs):
+        """Board View init"""
+        super().__init__(**kwargs)
+        self.model = model
+        self.tile_size = TILE_SIZE
+        self.atlas, self.face_coordinates = getAtlas(TILE_SIZE)
+        # Resizing lays the cells out on every step, the atlas follows once the size settles
+        self.atlas_trigger = Clock.create_trigger(lambda dt: self.updateAtlas(), 0.1)
+        self.cell_size = 0
+        # Rows whose vertices changed since the last upload, as a [start, stop) band
+        self.mesh_rows = None
+        # Pending upload, when the last one ended, how long it took and in which frame
+        self.flush_event = None
+        self.uploaded = 0.0
+        self.upload_cost = 0.0
+        self.upload_frame = -1
+        # The view transform: window position = layout position * zoom + (view_x, view_y)
+        self.zoom = 1.0
+        self.view_x = 0.0
+        self.view_y = 0.0
+        # Touches grabbed by this view, two of them pinch
+        self.touches = []
+        self.minimap_shown = False
+        # Rows of the minimap pixels changed since they were last uploaded, as a [start, stop) band
+        self.minimap_rows = None
+        with self.canvas.before:
+            self.scissor = ScissorPush()
+            PushMatrix()
+            self.view_translate = Translate(0, 0)
+            self.view_scale = Scale(1, 1, 1)
+        # Overlay with one pixel per cell and an outline drawn above the cells, e.g. for probabilities and hints
+        self.marker_cell = None
+        with self.canvas.after:
+            self.overlay_color = Color(1, 1, 1, 0)
+            self.overlay = Rectangle()
+            self.marker_color = Color(0, 0, 0, 0)
+            self.marker = Line(rectangle=(0, 0, 0, 0), width=2)
+            PopMatrix()
+            ScissorPop()
+        self.origin = (0, 0)
+        self.bind(pos=self.layoutCells, size=self.layoutCells)
+        self.buildMeshes()
+
+    def buildMeshes(self):
+        """Allocates the vertex buffer and the meshes for the size of the Board Model"""
+        width = self.model.width
+        height = self.model.height
+        # x, y, u, v for the four corners of every cell
+        self.vertices = np.zeros((height*width, 4, 4), dtype=np.float32)
+        self.vertices[:, :, 3] = [0, 0, 1, 1]
+        self.rows_per_mesh = max(MAX_MESH_CELLS // width, 1)
+        self.meshes = []
+        self.mesh_rows = None
+        self.minimap_rows = None
+        # Keeps the index buffers alive next to the meshes reading them
+        self.indices = []
+        for start in range(0, height, self.rows_per_mesh):
+            stop = min(start + self.rows_per_mesh, height)
+            cells = (stop - start)*width
+            indices = (np.arange(cells, dtype=np.uint16)[:, None]*4 + QUAD_INDICES).ravel()
+            self.indices.append(indices)
+            mesh = Mesh(mode="triangles", texture=self.atlas.texture, indices=memoryview(indices),
+                        vertices=memoryview(self.vertices[start*width:stop*width].ravel()))
+            self.meshes.append(mesh)
+        # The texture's first row is the top row of the Board, so changed rows are blitted where they are
+        self.minimap_pixels = np.zeros((height, width, 4), dtype=np.uint8)
+        texture = Texture.create(size=(width, height), colorfmt="rgba")
+        texture.flip_vertical()
+        texture.mag_filter = "nearest"
+        self.minimap = Rectangle(texture=texture)
+        self.minimap_shown = False
+        # Holds either the meshes or the minimap
+        self.detail = InstructionGroup()
+        for mesh in self.meshes:
+            self.detail.add(mesh)
+        self.canvas.clear()
+        with self.canvas:
+            Color(1, 1, 1, 1)
+        self.canvas.add(self.detail)
+        self.zoom = 1.0
+        self.layoutCells()
+        self.refresh()
+
+    def layoutCells(self, *args):
+        """Positions the square cells centered in the widget, odd rows shifted by the stagger of the topology"""
+        width = self.model.width
+        height = self.model.height
+        stagger = self.model.topology.stagger
+        size = min(self.width / (width + stagger), self.height / height)
+        left = self.x + (self.width - size*(width + stagger)) / 2
+        top = self.top - (self.height - size*height) / 2
+        self.cell_size = size
+        self.origin = (left, top)
+
+        xs = left + np.arange(width, dtype=np.float32)*size
+        shifts = (np.arange(height) % 2)*stagger*size
+        ys = top - np.arange(1, height + 1, dtype=np.float32)*size
+        vertices = self.vertices.reshape((height, width, 4, 4))
+        vertices[:, :, (0, 3), 0] = xs[None, :, None] + shifts[:, None, None]
+        vertices[:, :, (1, 2), 0] = xs[None, :, None] + shifts[:, None, None] + size
+        vertices[:, :, (0, 1), 1] = ys[:, None, None]
+        vertices[:, :, (2, 3), 1] = ys[:, None, None] + size
+        self.markDirty(0, height)
+        self.overlay.pos = (left, top - size*height)
+        self.overlay.size = (size*(width + stagger), size*height)
+        self.minimap.pos = (left, top - size*height)
+        self.minimap.size = (size*width, size*height)
+        self.positionMarker()
+        self.applyView()
+
+    def applyView(self):
+        """Keeps the zoomed Board on screen and updates the transform, the clipping and the level of detail"""
+        left, top = self.origin
+        size = self.cell_size
+        board_width = size*(self.model.width + self.model.topology.stagger)*self.zoom
+        board_height = size*self.model.height*self.zoom
+        # Centered while it fits, otherwise no margin is left at the widget's edges
+        if board_width <= self.width:
+            self.view_x = self.center_x - (left*self.zoom + board_width / 2)
+        else:
+            self.view_x = min(max(self.view_x, self.right - left*self.zoom - board_width), self.x - left*self.zoom)
+        bottom = top - size*self.model.height
+        if board_height <= self.height:
+            self.view_y = self.center_y - (bottom*self.zoom + board_height / 2)
+        else:
+            self.view_y = min(max(self.view_y, self.top - bottom*self.zoom - board_height), self.y - bottom*self.zoom)
+        self.view_translate.xy = (self.view_x, self.view_y)
+        self.view_scale.xyz = (self.zoom, self.zoom, 1)
+        self.scissor.x, self.scissor.y = int(self.x), int(self.y)
+        self.scissor.width, self.scissor.height = int(self.width), int(self.height)
+        self.showMinimap(size*self.zoom < MINIMAP_CELL_SIZE)
+        if tileSize(size*self.zoom) != self.tile_size:
+            self.atlas_trigger()
+
+    def zoomAt(self, x: float, y: float, factor: float):
+        """Zooms the view by factor, keeping the cell under the window position in place"""
+        max_zoom = max(MAX_ZOOM_CELL_SIZE / self.cell_size, 1.0) if self.cell_size > 0 else 1.0
+        zoom = min(max(self.zoom*factor, 1.0), max_zoom)
+        factor = zoom / self.zoom
+        self.view_x = x - (x - self.view_x)*factor
+        self.view_y = y - (y - self.view_y)*factor
+        self.zoom = zoom
+        self.applyView()
+
+    def panBy(self, dx: float, dy: float):
+        """Moves the zoomed Board by window pixels"""
+        self.view_x += dx
+        self.view_y += dy
+        self.applyView()
+
+    def showMinimap(self, shown: bool):
+        """Switches between drawing the cells and drawing the minimap"""
+        if shown == self.minimap_shown:
+            return
+        self.minimap_shown = shown
+        self.detail.clear()
+        if shown:
+            self.detail.add(self.minimap)
+        else:
+            for mesh in self.meshes:
+                self.detail.add(mesh)
+        # Uploads what changed while the other one was shown
+        self.scheduleUpload()
+
+    def isBusy(self) -> bool:
+        """Returns if the Board Model is being changed off the main thread, so it must not be read"""
+        return False
+
+    def updateAtlas(self):
+        """Switches to the atlas rendered at the current cell size"""
+        tile_size = tileSize(self.cell_size*self.zoom)
+        if tile_size == self.tile_size:
+            return
+        if self.isBusy():
+            # Redrawing reads the whole Board Model, so the switch waits for the move
+            self.atlas_trigger()
+            return
+        self.tile_size = tile_size
+        self.atlas, self.face_coordinates = getAtlas(tile_size)
+        for mesh in self.meshes:
+            mesh.texture = self.atlas.texture
+        self.refresh()
+
+    def showOverlay(self, colors: np.ndarray):
+        """Stretches one RGBA pixel per cell over the board"""
+        if self.model.topology.stagger:
+            # Two pixels per cell, so odd rows can be shifted by half a cell
+            doubled = np.repeat(colors, 2, axis=1)
+            colors = np.zeros((doubled.shape[0], doubled.shape[1] + 1, 4), dtype=np.uint8)
+            colors[0::2, :-1] = doubled[0::2]
+            colors[1::2, 1:] = doubled[1::2]
+        height, width = colors.shape[:2]
+        texture = self.overlay.texture
+        if texture is None or texture.size != (width, height):
+            texture = Texture.create(size=(width, height), colorfmt="rgba")
+            texture.mag_filter = "nearest"
+            texture.min_filter = "nearest"
+        # Texture rows start at the bottom, board rows at the top
+        texture.blit_buffer(np.ascontiguousarray(colors[::-1]).tobytes(), colorfmt="rgba", bufferfmt="ubyte")
+        self.overlay.texture = texture
+        self.overlay_color.a = 1
+
+    def hideOverlay(self):
+        """Hides the overlay"""
+        self.overlay_color.a = 0
+
+    def showMarker(self, x: int, y: int, color):
+        """Outlines one cell in the given color"""
+        self.marker_cell = (x, y)
+        self.marker_color.rgba = color
+        self.positionMarker()
+
+    def clearMarker(self):
+        """Hides the cell outline"""
+        self.marker_cell = None
+        self.marker_color.a = 0
+
+    def positionMarker(self):
+        """Moves the outline onto its cell"""
+        if self.marker_cell is None:
+            return
+        x, y = self.marker_cell
+        left, top = self.origin
+        size = self.cell_size
+        left += (y % 2)*self.model.topology.stagger*size
+        self.marker.rectangle = (left + x*size, top - (y + 1)*size, size, size)
+
+    def refresh(self):
+        """Redraws every cell from the Board Model in one pass over the whole board"""
+        everything = slice(None)
+        faces = cellFaces(self.model, everything, everything)
+        coordinates = self.face_coordinates[faces.ravel()]
+        self.vertices[:, (0, 3), 2] = coordinates[:, 0, None]
+        self.vertices[:, (1, 2), 2] = coordinates[:, 1, None]
+        self.minimap_pixels[:] = minimap_colors[faces]
+        self.markDirty(0, self.model.height)
+
+    def updateCells(self, changed):
+        """Redraws the given (x, y) cells from the Board Model"""
+        if not changed:
+            return
+        xs, ys = np.array(list(changed), dtype=np.intp).T
+        self.setFaces(ys, xs, cellFaces(self.model, ys, xs))
+
+    def setFaces(self, ys: np.ndarray, xs: np.ndarray, faces: np.ndarray):
+        """Points the texture coordinates of the given cells at their face in the atlas"""
+        coordinates = self.face_coordinates[faces]
+        cells = ys*self.model.width + xs
+        self.vertices[cells[:, None], (0, 3), 2] = coordinates[:, 0, None]
+        self.vertices[cells[:, None], (1, 2), 2] = coordinates[:, 1, None]
+        self.minimap_pixels[ys, xs] = minimap_colors[faces]
+        self.markDirty(int(ys.min()), int(ys.max()) + 1)
+
+    def markDirty(self, start: int, stop: int):
+        """Adds the [start, stop) rows to the band of changed rows, which is uploaded as one"""
+        bands = []
+        for band in (self.mesh_rows, self.minimap_rows):
+            if band is not None:
+                band = (min(start, band[0]), max(stop, band[1]))
+            bands.append(band or (start, stop))
+        self.mesh_rows, self.minimap_rows = bands
+        self.scheduleUpload()
+
+    def scheduleUpload(self):
+        """Schedules the upload of the changed rows for the next frame, or once UPLOAD_INTERVAL passed since the last one"""
+        if self.flush_event is not None:
+            return
+        delay = max(self.uploaded + UPLOAD_INTERVAL - time.perf_counter(), 0)
+        # looked up on every call, so an instrumented flushMeshes is picked up
+        self.flush_event = Clock.schedule_once(lambda dt: self.flushMeshes(), delay)
+
+    def isUploadDue(self) -> bool:
+        """Returns if changed rows wait for an upload that may run now"""
+        return self.flush_event is not None and time.perf_counter() >= self.uploaded + UPLOAD_INTERVAL
+
+    def flushMeshes(self, *args):
+        """Reuploads the meshes holding the band of changed rows, or that band of the minimap while it is shown"""
+        if self.flush_event is not None:
+            self.flush_event.cancel()
+            self.flush_event = None
+        start_time = time.perf_counter()
+        width = self.model.width
+        if self.minimap_shown:
+            # The meshes stay dirty until they are shown again
+            if self.minimap_rows is None:
+                return
+            start, stop = self.minimap_rows
+            self.minimap_rows = None
+            self.minimap.texture.blit_buffer(self.minimap_pixels[start:stop].ravel(), size=(width, stop - start),
+                                             colorfmt="rgba", pos=(0, start), bufferfmt="ubyte")
+            self.canvas.ask_update()
+        else:
+            if self.mesh_rows is None:
+                return
+            start, stop = self.mesh_rows
+            self.mesh_rows = None
+            rows = self.rows_per_mesh
+            for index in range(start // rows, (stop - 1) // rows + 1):
+                first = index*rows*width
+                last = min(first + rows*width, self.model.height*width)
+                self.meshes[index].vertices = memoryview(self.vertices[first:last].ravel())
+        self.uploaded = time.perf_counter()
+        self.upload_cost = self.uploaded - start_time
+        self.upload_frame = Clock.frames
+
+    def cellAt(self, x: float, y: float):
+        """Returns the (x, y) index of the cell under a window position or None"""
+        if self.cell_size <= 0:
+            return None
+        # Back from the window into the layout of the cells
+        x = (x - self.view_x) / self.zoom
+        y = (y - self.view_y) / self.zoom
+        left, top = self.origin
+        row = int((top - y) // self.cell_size)
+        column = int((x - left - (row % 2)*self.model.topology.stagger*self.cell_size) // self.cell_size)
+        if 0 <= column < self.model.width and 0 <= row < self.model.height:
+            return (column, row)
+        return None
+
+    def on_touch_down(self, touch):
+        if not self.collide_point(*touch.pos):
+            return super().on_touch_down(touch)
+        if self.zoomable and touch.is_mouse_scrolling:
+            if touch.button in ("scrolldown", "scrollup"):
+                self.zoomAt(touch.x, touch.y, 1.2 if touch.button == "scrolldown" else 1 / 1.2)
+            return True
+        cell = self.cellAt(*touch.pos)
+        if cell is None and not self.zoomable:
+            return super().on_touch_down(touch)
+        touch.grab(self)
+        touch.ud[self] = cell
+        if self.zoomable:
+            self.touches.append(touch)
+            # A pinch never taps
+            if len(self.touches) > 1:
+                for pinching in self.touches:
+                    pinching.ud["dragged"] = True
+        return True
+
+    def on_touch_move(self, touch):
+        """Pans with one touch and zooms around the middle of two"""
+        if touch.grab_current is not self:
+            return super().on_touch_move(touch)
+        if touch not in self.touches:
+            return True
+        if len(self.touches) > 1:
+            if touch not in self.touches[:2]:
+                return True
+            other = self.touches[1] if touch is self.touches[0] else self.touches[0]
+            before = Vector(touch.px, touch.py).distance(other.pos)
+            after = Vector(*touch.pos).distance(other.pos)
+            if before > 0:
+                self.zoomAt((touch.x + other.x) / 2, (touch.y + other.y) / 2, after / before)
+            self.panBy(touch.dx / 2, touch.dy / 2)
+            return True
+        if not touch.ud.get("dragged") and Vector(*touch.pos).distance(touch.opos) > PAN_DISTANCE:
+            touch.ud["dragged"] = True
+        if touch.ud.get("dragged"):
+            self.panBy(touch.dx, touch.dy)
+        return True
+
+    def on_touch_up(self, touch):
+        if touch.grab_current is not self:
+            return super().on_touch_up(touch)
+        touch.ungrab(self)
+        if touch in self.touches:
+            self.touches.remove(touch)
+        if touch.ud.get("dragged"):
+            return True
+        cell = self.cellAt(*touch.pos)
+        if cell is not None and cell == touch.ud.get(self):
+            self.dispatch("on_cell_release", *cell)
+        return True
+
+    def on_cell_release(self, x: int, y: int):
+        """Called when a cell was tapped"""
+        pass
@@ -22,7 +22,7 @@ source.include_exts = py,png,jpg,kv,atlas,ttf,png
 #source.exclude_exts = spec
 
 # (list) List of directory to exclude (let empty to not exclude anything)
-#source.exclude_dirs = tests, bin, venv
+source.exclude_dirs = benchmarks
 
 # (list) List of exclusions using pattern matching
 #source.exclude_patterns = license,images/*/*.jpg
@@ -36,7 +36,7 @@ version = 1.0
 
 # (list) Application requirements
 # comma separated e.g. requirements = sqlite3,kivy
-requirements = python3,kivy,numpy,
+requirements = python3,kivy,numpy,sqlite3
 
 # (str) Custom source folders for requirements
 # Sets custom source for any requirements with recipes
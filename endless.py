@@ -0,0 +1,306 @@
+import random
+import sqlite3
+from collections import OrderedDict
+import numpy as np
+from topology import countNeighbours, getTopology
+
+CHUNK_SIZE = 32
+# Towards 12 percent bombs the openings of an endless board grow without bound, and so would a cascade
+MIN_DENSITY = 0.15
+MAX_LOADED_CHUNKS = 256
+MAX_CACHED_MINES = 1024
+NEIGHBOURS = ((-1, -1), (0, -1), (1, -1), (-1, 0), (1, 0), (-1, 1), (0, 1), (1, 1))
+
+
+def zigzag(value: int) -> int:
+    """Maps integers to non-negative integers, 0, -1, 1, -2, ... to 0, 1, 2, 3, ..."""
+    return value*2 if value >= 0 else -value*2 - 1
+
+
+def chunkMines(seed: int, cx: int, cy: int, density: float) -> np.ndarray:
+    """Returns the bomb plane of a chunk, always the same for the same seed and chunk coordinates"""
+    rng = np.random.default_rng([seed, zigzag(cx), zigzag(cy)])
+    return rng.random((CHUNK_SIZE, CHUNK_SIZE)) < density
+
+
+class Chunk:
+    """Player state of one explored chunk, its bombs are regenerated from the seed instead of stored"""
+    __slots__ = ("revealed", "flags", "dirty")
+
+    def __init__(self, revealed: np.ndarray = None, flags: np.ndarray = None):
+        """Chunk init"""
+        self.revealed = revealed if revealed is not None else np.zeros((CHUNK_SIZE, CHUNK_SIZE), dtype=bool)
+        self.flags = flags if flags is not None else np.zeros((CHUNK_SIZE, CHUNK_SIZE), dtype=bool)
+        # changed since it was last written to the store
+        self.dirty = False
+
+
+class EndlessWorld:
+    """Endless Minesweeper Board split into chunks that only exist once the player touched them
+
+    Explored chunks are kept in memory up to max_loaded_chunks, the least recently used ones are written to an SQLite
+    store bit-packed and loaded back on demand, so memory stays bounded however far the player explores.
+    """
+    def __init__(self, path: str, density: float = 0.18, seed: int = None, max_loaded_chunks: int = MAX_LOADED_CHUNKS):
+        """Endless World init, starts a new world in the store at path"""
+        self.density = min(max(density, MIN_DENSITY), 0.5)
+        self.max_loaded_chunks = max_loaded_chunks
+        self.connection = sqlite3.connect(path)
+        # The store only backs the running world, losing it in a crash loses nothing else
+        self.connection.execute("PRAGMA synchronous = OFF")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS chunks (cx INTEGER NOT NULL, cy INTEGER NOT NULL, revealed BLOB NOT NULL, "
+            "flags BLOB NOT NULL, PRIMARY KEY (cx, cy)) WITHOUT ROWID")
+        self.reset(seed)
+
+    def reset(self, seed: int = None):
+        """Starts a new world, forgetting every chunk"""
+        self.seed = seed if seed is not None else random.getrandbits(64)
+        self.safe = None
+        self.first_reveal = True
+        self.lost = False
+        self.cleared = 0
+        self.flag_count = 0
+        self.chunks = OrderedDict()
+        # (cx, cy) -> (bombs, counts)
+        self.mine_cache = OrderedDict()
+        with self.connection:
+            self.connection.execute("DELETE FROM chunks")
+
+    def mines(self, cx: int, cy: int) -> np.ndarray:
+        """Returns the bomb plane of a chunk, with the first revealed cell and its neighbours kept free"""
+        return self.chunkPlanes(cx, cy)[0]
+
+    def counts(self, cx: int, cy: int) -> np.ndarray:
+        """Returns the adjacency counts of a chunk, which depend on the bombs along its neighbour chunks"""
+        return self.chunkPlanes(cx, cy)[1]
+
+    def generate(self, cx: int, cy: int) -> np.ndarray:
+        """Generates the bomb plane of a chunk"""
+        mines = chunkMines(self.seed, cx, cy, self.density)
+        if self.safe is not None:
+            x, y = self.safe
+            left = cx*CHUNK_SIZE
+            top = cy*CHUNK_SIZE
+            mines[max(y - 1 - top, 0):max(y + 2 - top, 0), max(x - 1 - left, 0):max(x + 2 - left, 0)] = False
+        return mines
+
+    def chunkPlanes(self, cx: int, cy: int):
+        """Returns the cached bombs and counts of a chunk, computing them from the 3x3 chunks around it"""
+        cached = self.mine_cache.get((cx, cy))
+        if cached is not None:
+            self.mine_cache.move_to_end((cx, cy))
+            return cached
+        rows = [np.hstack([self.generate(cx + dx, cy + dy) for dx in (-1, 0, 1)]) for dy in (-1, 0, 1)]
+        block = np.vstack(rows)
+        window = block[CHUNK_SIZE - 1:2*CHUNK_SIZE + 1, CHUNK_SIZE - 1:2*CHUNK_SIZE + 1]
+        mines = block[CHUNK_SIZE:2*CHUNK_SIZE, CHUNK_SIZE:2*CHUNK_SIZE].copy()
+        counts = countNeighbours(window)[1:-1, 1:-1].copy()
+        cached = self.mine_cache[(cx, cy)] = (mines, counts)
+        if len(self.mine_cache) > MAX_CACHED_MINES:
+            self.mine_cache.popitem(last=False)
+        return cached
+
+    def chunk(self, cx: int, cy: int, create: bool = True) -> Chunk:
+        """Returns the state of a chunk, loading it from the store. Untouched chunks are only created if asked to"""
+        key = (cx, cy)
+        chunk = self.chunks.get(key)
+        if chunk is not None:
+            self.chunks.move_to_end(key)
+            return chunk
+        row = self.connection.execute("SELECT revealed, flags FROM chunks WHERE cx = ? AND cy = ?", key).fetchone()
+        if row is not None:
+            cells = CHUNK_SIZE*CHUNK_SIZE
+            planes = [np.unpackbits(np.frombuffer(blob, dtype=np.uint8), count=cells).astype(bool).reshape(
+                (CHUNK_SIZE, CHUNK_SIZE)) for blob in row]
+            chunk = Chunk(*planes)
+        elif create:
+            chunk = Chunk()
+        else:
+            return None
+        self.chunks[key] = chunk
+        return chunk
+
+    def trim(self):
+        """Writes the least recently used chunks beyond the limit to the store. Called between moves, never during"""
+        evicted = []
+        while len(self.chunks) > self.max_loaded_chunks:
+            key, chunk = self.chunks.popitem(last=False)
+            if chunk.dirty:
+                evicted.append(key + (np.packbits(chunk.revealed).tobytes(), np.packbits(chunk.flags).tobytes()))
+        if evicted:
+            with self.connection:
+                self.connection.executemany("INSERT OR REPLACE INTO chunks VALUES (?, ?, ?, ?)", evicted)
+
+    def locate(self, x: int, y: int, create: bool = True):
+        """Returns the chunk and the chunk local coordinates of a cell, the chunk is None if untouched and not created"""
+        cx, lx = divmod(x, CHUNK_SIZE)
+        cy, ly = divmod(y, CHUNK_SIZE)
+        return self.chunk(cx, cy, create), cx, cy, lx, ly
+
+    def reveal(self, x: int, y: int) -> set:
+        """Reveals a cell, cascading over empty regions across chunk borders. Returns the changed cells"""
+        if self.lost:
+            return set()
+        if self.first_reveal:
+            # The first revealed cell and its neighbours are never bombs
+            self.safe = (x, y)
+            self.mine_cache.clear()
+            self.first_reveal = False
+        return self.cascade([(x, y)])
+
+    def flag(self, x: int, y: int) -> set:
+        """Toggles the flag of a concealed cell. Returns the changed cells"""
+        chunk, _, _, lx, ly = self.locate(x, y)
+        if self.lost or chunk.revealed[ly, lx]:
+            return set()
+        flagged = not chunk.flags[ly, lx]
+        chunk.flags[ly, lx] = flagged
+        chunk.dirty = True
+        self.flag_count += 1 if flagged else -1
+        return {(x, y)}
+
+    def chord(self, x: int, y: int) -> set:
+        """Reveals all unflagged neighbours of a revealed cell whose bombs are all flagged. Returns the changed cells"""
+        chunk, cx, cy, lx, ly = self.locate(x, y)
+        if self.lost or not chunk.revealed[ly, lx]:
+            return set()
+        neighbours = [(x + dx, y + dy) for dx, dy in NEIGHBOURS]
+        flags = 0
+        for nx, ny in neighbours:
+            other, _, _, nlx, nly = self.locate(nx, ny, create=False)
+            flags += other is not None and bool(other.flags[nly, nlx])
+        if flags != self.counts(cx, cy)[ly, lx]:
+            return set()
+        return self.cascade(neighbours)
+
+    def cascade(self, seeds) -> set:
+        """Reveals the seed cells and floods from empty cells with an explicit stack. Returns the revealed cells"""
+        # (cx, cy) -> (chunk, bombs, counts), looked up once per chunk the cascade touches. The chunk stays None while
+        # it is untouched and only read, so looking across a border does not materialize the chunk behind it
+        planes = {}
+
+        def lookup(x, y, create=True):
+            cx, lx = divmod(x, CHUNK_SIZE)
+            cy, ly = divmod(y, CHUNK_SIZE)
+            entry = planes.get((cx, cy))
+            if entry is None or entry[0] is None and create:
+                mines, counts = self.chunkPlanes(cx, cy) if entry is None else entry[1:]
+                entry = planes[(cx, cy)] = (self.chunk(cx, cy, create), mines, counts)
+            return entry, lx, ly
+
+        changed = set()
+        stack = []
+        for x, y in seeds:
+            (chunk, mines, _), lx, ly = lookup(x, y)
+            if chunk.revealed[ly, lx] or chunk.flags[ly, lx]:
+                continue
+            chunk.revealed[ly, lx] = True
+            chunk.dirty = True
+            changed.add((x, y))
+            if mines[ly, lx]:
+                self.lost = True
+                continue
+            stack.append((x, y))
+
+        while stack:
+            x, y = stack.pop()
+            self.cleared += 1
+            (_, _, counts), lx, ly = lookup(x, y, create=False)
+            empty = counts[ly, lx] == 0
+            for dx, dy in NEIGHBOURS:
+                nx = x + dx
+                ny = y + dy
+                (chunk, mines, counts), nlx, nly = lookup(nx, ny, create=False)
+                if mines[nly, nlx] or chunk is not None and (chunk.revealed[nly, nlx] or chunk.flags[nly, nlx]):
+                    continue
+                # Like on the fixed Board, numbered cells also open the empty cells next to them
+                if empty or counts[nly, nlx] == 0:
+                    if chunk is None:
+                        (chunk, _, _), _, _ = lookup(nx, ny)
+                    chunk.revealed[nly, nlx] = True
+                    chunk.dirty = True
+                    changed.add((nx, ny))
+                    stack.append((nx, ny))
+        return changed
+
+    def window(self, left: int, top: int, width: int, height: int):
+        """Returns the revealed, flag, bomb and count planes of a rectangle of the world
+
+        Untouched chunks are not materialized, they are concealed everywhere. Bombs and counts are only filled in
+        where they can be seen, in explored chunks and, once the game is lost, everywhere.
+        """
+        revealed = np.zeros((height, width), dtype=bool)
+        flags = np.zeros((height, width), dtype=bool)
+        mines = np.zeros((height, width), dtype=bool)
+        counts = np.zeros((height, width), dtype=np.int8)
+        for cy in range(top // CHUNK_SIZE, (top + height - 1) // CHUNK_SIZE + 1):
+            for cx in range(left // CHUNK_SIZE, (left + width - 1) // CHUNK_SIZE + 1):
+                # overlap of the chunk and the window, in window and in chunk coordinates
+                x0 = max(cx*CHUNK_SIZE, left)
+                x1 = min((cx + 1)*CHUNK_SIZE, left + width)
+                y0 = max(cy*CHUNK_SIZE, top)
+                y1 = min((cy + 1)*CHUNK_SIZE, top + height)
+                target = (slice(y0 - top, y1 - top), slice(x0 - left, x1 - left))
+                source = (slice(y0 - cy*CHUNK_SIZE, y1 - cy*CHUNK_SIZE), slice(x0 - cx*CHUNK_SIZE, x1 - cx*CHUNK_SIZE))
+                chunk = self.chunk(cx, cy, create=False)
+                if chunk is not None:
+                    revealed[target] = chunk.revealed[source]
+                    flags[target] = chunk.flags[source]
+                if chunk is not None or self.lost:
+                    chunk_mines, chunk_counts = self.chunkPlanes(cx, cy)
+                    mines[target] = chunk_mines[source]
+                    counts[target] = chunk_counts[source]
+        if self.lost:
+            revealed |= mines
+        # Scrolling loads chunks back from the store, they are evicted again like after a move
+        self.trim()
+        return revealed, flags, mines, counts
+
+    def close(self):
+        """Closes the store"""
+        self.connection.close()
+
+
+class Viewport:
+    """Board Model shaped window onto an Endless World, which a Board View can draw"""
+    def __init__(self, world: EndlessWorld, width: int, height: int):
+        """Viewport init, centered on the origin of the world"""
+        self.world = world
+        self.width = width
+        self.height = height
+        # Board Views lay the cells out by it, the world is always square
+        self.topology = getTopology("square", width, height)
+        self.left = -(width // 2)
+        self.top = -(height // 2)
+        self.load()
+
+    def load(self):
+        """Copies the visible part of the world"""
+        self.revealed, self.flags, self.mines, self.counts = self.world.window(
+            self.left, self.top, self.width, self.height)
+
+    def resize(self, width: int, height: int):
+        """Changes the amount of visible cells, keeping the center"""
+        self.left += (self.width - width) // 2
+        self.top += (self.height - height) // 2
+        self.width = width
+        self.height = height
+        self.topology = getTopology("square", width, height)
+        self.load()
+
+    def scroll(self, dx: int, dy: int):
+        """Moves the window by whole cells"""
+        self.left += dx
+        self.top += dy
+        self.load()
+
+    def center(self):
+        """Moves the window back onto the origin of the world"""
+        self.left = -(self.width // 2)
+        self.top = -(self.height // 2)
+        self.load()
+
+    def toWorld(self, x: int, y: int):
+        """Returns the world coordinates of a visible cell"""
+        return self.left + x, self.top + y
@@ -0,0 +1,987 @@
+from kivy.app import App
+from kivy.clock import Clock, mainthread
+from kivy.logger import Logger
+from kivy.properties import NumericProperty
+from kivy.uix.boxlayout import BoxLayout
+from kivy.uix.button import Button
+from kivy.uix.label import Label
+from kivy.uix.popup import Popup
+from kivy.uix.togglebutton import ToggleButton
+import numpy as np
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from analytics import analyze
+from board import BoardModel
+from boardview import BoardView, cellFaces, flag_icon, heatmapColors, shovel_icon
+from endless import EndlessWorld, Viewport
+from history import MoveHistory
+from layouts import layout_cache
+from probability import ProbabilityMap
+from profiler import Profiler
+from replay import CHORD, FLAG, LAYOUT_SEED, REVEAL, GameRecorder, applyAction, readReplay
+from snapshot import restoreSnapshot, saveSnapshot
+from solver import HintSolver
+from topology import Topology
+import noguess
+
+
+class StatusLabel(Button):
+    """Label that displays a few useful informations, e.g. Timer, Bombs left,..."""
+    time = NumericProperty(0)
+    bomb_count = NumericProperty(0)
+
+    def __init__(self, **kwargs):
+        """Status Label init"""
+        super().__init__(**kwargs)
+        self.running = False
+        self.start_time = 0
+        self.elapsed = 0
+        self.clock_event = None
+        # What the count next to the Timer stands for
+        self.counter_name = "Flags remaining"
+        self.disabled = True
+        self.background_disabled_normal = "down.png"
+        self.color = (0,0,0,1)
+
+    def on_time(self, instance, value):
+        """Updates Label text when the displayed seconds change"""
+        self.updateText()
+
+    def on_bomb_count(self, instance, value):
+        """Updates Label text when the remaining flags change"""
+        self.updateText()
+        
+    def updateText(self):
+        """Updates Label text"""
+        self.text = f"{self.time // 60}:{self.time % 60:02d} | {self.counter_name}: {self.bomb_count}"
+
+    def getElapsed(self) -> float:
+        """Returns the exact elapsed time in seconds"""
+        if self.running:
+            return self.elapsed + time.monotonic() - self.start_time
+        return self.elapsed
+
+    def timer(self, dt = 0):
+        """Clock callback, maintains Timer and schedules itself for the next full second"""
+        if not self.running:
+            return
+        elapsed = self.getElapsed()
+        self.time = int(elapsed)
+        self.clock_event = Clock.schedule_once(self.timer, 1 - elapsed % 1)
+        
+    def startTimer(self):
+        """Starts the Timer"""
+        if self.running:
+            return
+        self.running = True
+        self.start_time = time.monotonic()
+        self.timer()
+
+    def stopTimer(self):
+        """Stops the Timer"""
+        if not self.running:
+            return
+        self.elapsed = self.getElapsed()
+        self.running = False
+        if self.clock_event is not None:
+            self.clock_event.cancel()
+            self.clock_event = None
+
+    def getScore(self, width, height, bomb_count):
+        """Returns the score"""
+        return int(1/(self.getElapsed()+1) * width * height * bomb_count + 1)
+
+    def reset(self):
+        """Resets the Status Label"""
+        self.stopTimer()
+        self.elapsed = 0
+        self.time = 0
+        self.bomb_count = 0
+        self.text = "0:00"
+
+    def restore(self, elapsed: float):
+        """Sets the Timer of a resumed Game, stopped"""
+        self.stopTimer()
+        self.elapsed = elapsed
+        self.time = int(elapsed)
+    
+
+
+class ToolBar(BoxLayout):
+    """Tool Bar for switching cell modes or displaying information"""
+    def __init__(self, **kwargs):
+        """Init for ToolBar"""
+        super().__init__(**kwargs)
+        self.orientation = "horizontal"
+        self.size_hint_y = 0.05
+
+        self.reveal = ToggleButton(text = shovel_icon, group = "tool", state = "down")
+        self.reveal.font_name = "celltext.ttf"
+        self.reveal.background_normal = "normal.png"
+        self.reveal.background_down = "down.png"
+        self.reveal.color = (0,0,0,1)
+        self.add_widget(self.reveal)
+
+        self.flag = ToggleButton(text = flag_icon, group = "tool")
+        self.flag.font_name = "celltext.ttf"
+        self.flag.background_normal = "normal.png"
+        self.flag.background_down = "down.png"
+        self.flag.color = (0,0,0,1)
+        self.add_widget(self.flag)
+
+        self.hint = Button(text = "Hint")
+        self.hint.background_normal = "normal.png"
+        self.hint.background_down = "down.png"
+        self.hint.color = (0,0,0,1)
+        self.add_widget(self.hint)
+
+        self.auto_flag = ToggleButton(text = "Auto")
+        self.auto_flag.background_normal = "normal.png"
+        self.auto_flag.background_down = "down.png"
+        self.auto_flag.color = (0,0,0,1)
+        self.add_widget(self.auto_flag)
+
+        # Only enabled in practice Games
+        self.undo = Button(text = "Undo", disabled = True)
+        self.undo.background_normal = "normal.png"
+        self.undo.background_down = "down.png"
+        self.undo.color = (0,0,0,1)
+        self.add_widget(self.undo)
+
+        self.redo = Button(text = "Redo", disabled = True)
+        self.redo.background_normal = "normal.png"
+        self.redo.background_down = "down.png"
+        self.redo.color = (0,0,0,1)
+        self.add_widget(self.redo)
+
+        self.odds = ToggleButton(text = "%")
+        self.odds.background_normal = "normal.png"
+        self.odds.background_down = "down.png"
+        self.odds.color = (0,0,0,1)
+        self.add_widget(self.odds)
+
+        self.profile = ToggleButton(text = "ms")
+        self.profile.background_normal = "normal.png"
+        self.profile.background_down = "down.png"
+        self.profile.color = (0,0,0,1)
+        self.add_widget(self.profile)
+
+        self.status_label = StatusLabel(text = "0:00", size_hint_x = 2)
+        self.add_widget(self.status_label)
+
+    def isFlaggingEnabled(self) -> bool:
+        """Returns if the Flag Button is enabled or not"""
+        if self.reveal.state == "down":
+            return False
+        elif self.flag.state == "down":
+            return True
+
+    def isAutoFlaggingEnabled(self) -> bool:
+        """Returns if certain bombs are flagged automatically"""
+        return self.auto_flag.state == "down"
+
+    def isHeatmapEnabled(self) -> bool:
+        """Returns if the bomb probabilities are shown"""
+        return self.odds.state == "down"
+    
+    def reset(self):
+        """Resets the Toolbar"""
+        self.status_label.reset()
+
+class GameBoard(BoardView):
+    """Draws the Board and handles the Game"""
+    zoomable = True
+    # Replay files kept in the replay folder besides those of personal bests, the oldest ones are deleted
+    KEPT_REPLAYS = 50
+    # Boards from this many cells compute reveals in the worker thread and draw them over several frames
+    ASYNC_CELLS = 2500
+    # Seconds of a frame spent drawing a reveal and uploading it, the rest of the 16 ms is left to Kivy and the worker
+    FRAME_BUDGET = 0.006
+    # Cells drawn per slice, the budget is checked before every slice
+    SLICE_CELLS = 512
+    # Rings around the tapped cell the ripple spreads per second, a slow frame draws more rings at once
+    RIPPLE_SPEED = 120
+    # Seconds the heatmap worker spends on one compute, components left over keep their last probabilities
+    HEATMAP_BUDGET = 0.25
+
+    def __init__(self, width : int, height : int, bomb_count : int, tool_bar: ToolBar, no_guess : bool = False, topology : str = "square", practice : bool = False, **kwargs):
+        """Game Board Init"""
+        self.tool_bar = tool_bar
+        self.no_guess = no_guess
+        # Practice Games can be undone, so they are neither recorded nor ranked
+        self.practice = practice
+        self.recorder = None
+        self.last_replay = None
+        self.replay_event = None
+        # Reveals and chords on large Boards run on one worker thread, see play
+        self.worker = ThreadPoolExecutor(max_workers = 1, thread_name_prefix = "cascade")
+        # (future, action, x, y, first move) of the move the worker is computing
+        self.move = None
+        # (future, x, y) of the first reveal of a no-guess Game whose seed the worker is searching
+        self.search = None
+        # (ys, xs, faces, rings) of a computed move being drawn, sorted by ring, and how much of it is drawn
+        self.drawing = None
+        self.drawn = 0
+        self.draw_event = None
+        # When the drawing started and how long its last slice took
+        self.draw_start = 0.0
+        self.slice_cost = 0.0
+        self.ripple = True
+        # (x, y, flagging) of taps made while a move was in flight
+        self.queued_taps = []
+        # Ready no-guess layout whose start cell is suggested to the player, any ready layout opening the first tap is used
+        self.layout = None
+        # Bomb probabilities are computed on their own worker from a snapshot of the Board Model
+        self.heatmap_worker = ThreadPoolExecutor(max_workers = 1, thread_name_prefix = "heatmap")
+        # Future of the heatmap being computed, and if the Board changed since its snapshot was taken
+        self.heatmap = None
+        self.heatmap_outdated = False
+        app = App.get_running_app()
+        self.replay_dir = os.path.join(app.user_data_dir, "replays") if app is not None else None
+        super(GameBoard, self).__init__(BoardModel(width, height, bomb_count, topology = topology), **kwargs)
+        self.solver = HintSolver(self.model)
+        self.probability_map = ProbabilityMap(self.model)
+        self.history = MoveHistory(self.model, self.solver)
+        self.tool_bar.status_label.bomb_count = self.model.flags_remaining
+        self.takeLayout()
+        self.startHistory()
+        self.tool_bar.hint.bind(on_release = lambda x: self.showHint())
+        self.tool_bar.undo.bind(on_release = lambda x: self.undo())
+        self.tool_bar.redo.bind(on_release = lambda x: self.redo())
+        self.tool_bar.odds.bind(state = lambda x, state: self.updateHeatmap())
+    
+    def restart(self):
+        """Restarts The Game"""
+        self.newGame(self.model.width, self.model.height, self.model.init_bomb_count)
+
+    def newGame(self, width : int, height : int, bomb_count : int, topology : str = None):
+        """Starts a new Game, keeping the topology unless given. Rebuilds the Board only if its size or topology changed"""
+        self.queued_taps = []
+        self.settleMove(discard = True)
+        topology = topology or self.model.topology_name
+        resized = (width, height, topology) != (self.model.width, self.model.height, self.model.topology_name)
+        self.model.width = width
+        self.model.height = height
+        self.model.init_bomb_count = bomb_count
+        self.model.topology_name = topology
+        self.stopReplay()
+        self.stopRecording()
+        self.tool_bar.reset()
+        self.model.reset()
+        self.solver.reset()
+        self.clearMarker()
+        self.heatmap = None
+        self.hideOverlay()
+        self.tool_bar.status_label.bomb_count = self.model.flags_remaining
+        self.takeLayout()
+        self.startHistory()
+        if resized:
+            self.buildMeshes()
+        else:
+            self.refresh()
+
+    def takeLayout(self):
+        """Suggests a ready no-guess layout for the new Game by outlining the cell it starts from"""
+        self.layout = None
+        # Layouts are prepared until the first tap
+        layout_cache.pause(False)
+        if not self.no_guess:
+            return
+        configuration = self.layoutConfiguration()
+        # Also prepares the layouts of the next restarts meanwhile
+        layout_cache.configure(configuration)
+        self.layout = layout_cache.peek(configuration)
+        if self.layout is not None:
+            self.showMarker(*self.layout.start, (0, 0.6, 0, 1))
+
+    def layoutConfiguration(self):
+        """Returns the (width, height, bomb_count, topology) the no-guess layouts of this Game are prepared for"""
+        model = self.model
+        return (model.width, model.height, model.bomb_count, model.topology_name)
+
+    def startHistory(self):
+        """Starts the undo history of a practice Game, Games without undo keep none"""
+        if self.practice:
+            self.history.reset()
+        else:
+            self.history.stop()
+        self.tool_bar.undo.disabled = not self.practice
+        self.tool_bar.redo.disabled = not self.practice
+
+    def undo(self):
+        """Takes back the last move of a practice Game, also the one that lost it"""
+        if self.replay_event is not None or not self.settleHistory():
+            return
+        self.showHistoryMove(self.history.undo())
+
+    def redo(self):
+        """Plays the last taken back move of a practice Game again"""
+        if self.replay_event is not None or not self.settleHistory():
+            return
+        self.showHistoryMove(self.history.redo())
+
+    def settleHistory(self) -> bool:
+        """Finishes a move in flight before an undo or redo, returns False if it ended the Game
+
+        A Game ended that way shows its Popup, which offers the undo itself.
+        """
+        self.queued_taps = []
+        if not self.isBusy():
+            return True
+        self.settleMove()
+        return not self.model.lost and not self.model.won
+
+    def showHistoryMove(self, cells):
+        """Redraws the flat cells an undo or redo changed and continues or ends the Game from there"""
+        if cells is None:
+            return
+        model = self.model
+        ys, xs = np.divmod(cells, model.width)
+        self.setFaces(ys, xs, cellFaces(model, ys, xs))
+        self.tool_bar.status_label.bomb_count = model.flags_remaining
+        self.clearMarker()
+        if model.lost:
+            self.lose()
+            return
+        if model.won:
+            self.win()
+            return
+        self.tool_bar.status_label.startTimer()
+        self.updateHeatmap()
+
+    def render(self, changed):
+        """Redraws the cells whose state changed in the Board Model"""
+        self.updateCells(changed)
+        self.tool_bar.status_label.bomb_count = self.model.flags_remaining
+        self.solver.update(changed)
+        self.clearMarker()
+        self.updateHeatmap()
+
+    def updateHeatmap(self):
+        """Shows the bomb probability of every concealed cell if enabled, computed by the heatmap worker"""
+        model = self.model
+        if self.isBusy():
+            return
+        if not self.tool_bar.isHeatmapEnabled() or model.lost or model.won:
+            self.heatmap = None
+            self.hideOverlay()
+            return
+        if self.heatmap is not None:
+            # Computed again once the running compute is done, the overlay shows the last heatmap meanwhile
+            self.heatmap_outdated = True
+            return
+        self.heatmap_outdated = False
+        self.heatmap = self.heatmap_worker.submit(self.probability_map.compute, self.probability_map.snapshot(), self.HEATMAP_BUDGET)
+        self.heatmap.add_done_callback(self.onHeatmapComputed)
+
+    @mainthread
+    def onHeatmapComputed(self, future):
+        """Shows a computed heatmap, unless the Game ended or was restarted meanwhile"""
+        if future is not self.heatmap:
+            return
+        self.heatmap = None
+        model = self.model
+        if not self.tool_bar.isHeatmapEnabled() or model.lost or model.won:
+            return
+        # Cells revealed since the snapshot show no probability
+        self.showOverlay(heatmapColors(np.where(model.revealed, np.nan, future.result())))
+        if self.heatmap_outdated:
+            self.updateHeatmap()
+
+    def showHint(self):
+        """Outlines a certainly safe cell in green or a certain bomb in red"""
+        model = self.model
+        if model.first_reveal or model.lost or model.won or self.isBusy():
+            return
+        hint = self.solver.hint()
+        if hint is None:
+            self.clearMarker()
+            return
+        x, y, is_mine = hint
+        self.showMarker(x, y, (1, 0, 0, 1) if is_mine else (0, 0.6, 0, 1))
+
+    def autoFlag(self):
+        """Flags every bomb the solver is certain about"""
+        model = self.model
+        changed = set()
+        for x, y in self.solver.solve()[1]:
+            if not model.flags[y, x]:
+                self.record(FLAG, x, y)
+                changed |= model.flag(x, y)
+        if changed:
+            self.render(changed)
+            self.winCheck()
+
+    def record(self, action: int, x: int, y: int):
+        """Streams an action to the replay file of the Game, which is opened once the layout is final"""
+        if self.replay_event is not None or self.replay_dir is None or self.practice:
+            return
+        if self.recorder is None:
+            os.makedirs(self.replay_dir, exist_ok = True)
+            # The replays of personal bests stay watchable from the highscores
+            bests = App.get_running_app().openHighscores().bestReplays()
+            replays = [path for path in (os.path.join(self.replay_dir, name) for name in sorted(os.listdir(self.replay_dir)))
+                       if path not in bests]
+            for path in replays[:max(len(replays) - self.KEPT_REPLAYS + 1, 0)]:
+                os.remove(path)
+            path = os.path.join(self.replay_dir, time.strftime("%Y%m%d-%H%M%S") + f"-{self.model.seed:016x}.msr")
+            self.recorder = GameRecorder(path, self.model)
+            self.last_replay = path
+        self.recorder.record(action, x, y)
+
+    def stopRecording(self):
+        """Closes the replay file of the Game"""
+        if self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
+
+    def perform(self, action: int, x: int, y: int):
+        """Records an action, applies it to the Board Model and updates the Game"""
+        model = self.model
+        first = model.first_reveal
+        self.record(action, x, y)
+        changed = applyAction(model, action, x, y)
+        # The Game Over reveal redraws the whole board anyway
+        if model.lost:
+            self.lose()
+            return
+        if not changed:
+            return
+        self.render(changed)
+        if first:
+            self.tool_bar.status_label.startTimer()
+        if action == FLAG:
+            self.winCheck()
+        # Automatic flags are part of the recording, so a replay must not add them again
+        elif self.replay_event is None and self.tool_bar.isAutoFlaggingEnabled():
+            self.autoFlag()
+
+    def play(self, action: int, x: int, y: int):
+        """Performs a tapped action, reveals and chords on large Boards are computed by the worker"""
+        model = self.model
+        if action == FLAG or model.width*model.height < self.ASYNC_CELLS:
+            self.perform(action, x, y)
+            return
+        self.record(action, x, y)
+        future = self.worker.submit(self.computeMove, action, x, y)
+        self.move = (future, action, x, y, model.first_reveal)
+        future.add_done_callback(self.onMoveComputed)
+
+    def computeMove(self, action: int, x: int, y: int):
+        """Worker thread, applies a move and returns the faces of the changed cells sorted by ring around (x, y)
+
+        Nothing on the main thread reads the Board Model or the solver until the move is drawn.
+        """
+        model = self.model
+        changed = applyAction(model, action, x, y)
+        if model.lost or not changed:
+            return None
+        self.solver.update(changed)
+        xs, ys = np.array(list(changed), dtype=np.intp).T
+        rings = np.maximum(np.abs(xs - x), np.abs(ys - y))
+        order = np.argsort(rings, kind = "stable")
+        ys = ys[order]
+        xs = xs[order]
+        return ys, xs, cellFaces(model, ys, xs), rings[order]
+
+    @mainthread
+    def onMoveComputed(self, future):
+        """Starts drawing a computed move, unless it was settled meanwhile"""
+        if self.move is not None and self.move[0] is future:
+            self.applyMove()
+
+    def applyMove(self, at_once: bool = False):
+        """Takes over the move of the worker, draws it over the next frames or at once"""
+        future, action, x, y, first = self.move
+        self.move = None
+        result = future.result()
+        if self.model.lost:
+            self.queued_taps = []
+            self.lose()
+            return
+        if first:
+            self.tool_bar.status_label.startTimer()
+        if result is None:
+            self.finishMove()
+            return
+        self.drawing = result
+        self.drawn = 0
+        self.draw_start = time.perf_counter()
+        if at_once:
+            self.drawStep(at_once = True)
+        else:
+            self.draw_event = Clock.schedule_interval(self.drawStep, 0)
+            self.drawStep()
+
+    def drawStep(self, dt = 0, at_once: bool = False):
+        """Clock callback, uploads the rows drawn so far if due and draws the next rings within the frame budget"""
+        start = time.perf_counter()
+        # An upload earlier in this frame counts as well
+        spent = self.upload_cost if self.upload_frame == Clock.frames else 0.0
+        if not at_once and self.isUploadDue():
+            self.flushMeshes()
+        # A frame without an upload draws at least one slice, so the drawing goes on however long slices take
+        uploaded = self.upload_frame == Clock.frames
+        ys, xs, faces, rings = self.drawing
+        index = self.drawn
+        stop = len(ys)
+        if self.ripple and not at_once:
+            # At least the next ring, however slow the frames are
+            reached = max((start - self.draw_start)*self.RIPPLE_SPEED, rings[index] + 1)
+            stop = int(np.searchsorted(rings, reached))
+        while index < stop and (at_once or not uploaded and index == self.drawn
+                                or spent + time.perf_counter() - start + self.slice_cost < self.FRAME_BUDGET):
+            end = min(index + self.SLICE_CELLS, stop)
+            slice_start = time.perf_counter()
+            self.setFaces(ys[index:end], xs[index:end], faces[index:end])
+            self.slice_cost = time.perf_counter() - slice_start
+            index = end
+        self.drawn = index
+        if index == len(ys):
+            self.finishMove()
+
+    def finishMove(self):
+        """Updates the Game once a move is drawn and plays the taps that came in meanwhile"""
+        if self.draw_event is not None:
+            self.draw_event.cancel()
+            self.draw_event = None
+        self.drawing = None
+        self.tool_bar.status_label.bomb_count = self.model.flags_remaining
+        self.clearMarker()
+        self.updateHeatmap()
+        if self.tool_bar.isAutoFlaggingEnabled():
+            self.autoFlag()
+        self.playQueuedTaps()
+
+    def playQueuedTaps(self):
+        """Plays the taps that came in while the Board was busy, until it is busy again"""
+        taps = self.queued_taps
+        self.queued_taps = []
+        for i, (x, y, flagging) in enumerate(taps):
+            if self.model.lost or self.model.won:
+                return
+            if self.isBusy():
+                self.queued_taps = taps[i:] + self.queued_taps
+                return
+            # Checked against the Board as it is now, e.g. a tap on a cell the cascade revealed becomes a chord
+            self.tap(x, y, flagging)
+
+    def settleMove(self, discard: bool = False):
+        """Waits for a move in flight and draws the rest of it at once, e.g. before the Board is saved
+
+        discard drops the move without drawing or ending the Game, for callers that reset or redraw the Board anyway.
+        """
+        if self.search is not None:
+            if discard:
+                self.search = None
+            else:
+                self.search[0].result()
+                self.applySeed()
+        if self.move is not None:
+            self.move[0].result()
+            if not discard:
+                self.applyMove(at_once = True)
+                return
+            self.move = None
+        if self.drawing is not None:
+            if not discard:
+                self.drawStep(at_once = True)
+                return
+            self.draw_event.cancel()
+            self.draw_event = None
+            self.drawing = None
+
+    def isBusy(self) -> bool:
+        """Returns if a no-guess seed is searched or a move is computed or drawn"""
+        return self.search is not None or self.move is not None or self.drawing is not None
+
+    def searchSeed(self, x: int, y: int):
+        """Searches a no-guess Board starting from (x, y) on the worker and outlines the cell meanwhile"""
+        model = self.model
+        future = self.worker.submit(noguess.findNoGuessSeed, model.width, model.height, model.bomb_count, (x, y),
+                                    topology = model.topology_name)
+        self.search = (future, x, y)
+        self.showMarker(x, y, (0.5, 0.5, 0.5, 1))
+        future.add_done_callback(self.onSeedFound)
+
+    @mainthread
+    def onSeedFound(self, future):
+        """Starts the Game from a found seed, unless it was settled meanwhile"""
+        if self.search is not None and self.search[0] is future:
+            self.applySeed()
+
+    def applySeed(self):
+        """Reveals the first cell of the searched Board, then plays the taps that came in meanwhile"""
+        future, x, y = self.search
+        self.search = None
+        self.clearMarker()
+        # Falls back to a random Board if no solvable one was found in time
+        self.model.seed = future.result()[0]
+        self.play(REVEAL, x, y)
+        if not self.isBusy():
+            self.playQueuedTaps()
+
+    def tap(self, x: int, y: int, flagging: bool):
+        """Plays a tap with the tool it was made with"""
+        model = self.model
+        # Everything since the last tap is one move of the undo history
+        self.history.commit()
+        if model.first_reveal:
+            # The suggested layout if it opens the tapped cell, otherwise any other ready one that does
+            layout = layout_cache.take(self.layoutConfiguration(), (x, y)) if self.no_guess else None
+            if layout is not None:
+                # The start cell of the layout opens the tapped cell as well, so the Game starts from there
+                model.seed = layout.seed
+                model.setMines(layout.mines, layout.counts)
+                model.first_reveal = False
+                x, y = layout.start
+                self.tool_bar.status_label.startTimer()
+            self.layout = None
+            layout_cache.pause()
+            if layout is None and self.no_guess:
+                self.searchSeed(x, y)
+                return
+            self.play(REVEAL, x, y)
+        elif flagging:
+            self.play(FLAG, x, y)
+        elif not model.flags[y, x]:
+            self.play(CHORD if model.revealed[y, x] else REVEAL, x, y)
+
+    def on_cell_release(self, x: int, y: int):
+        """Callback for a tapped Cell, queued while a move is computed or drawn"""
+        if self.replay_event is not None:
+            return
+        tap = (x, y, self.tool_bar.isFlaggingEnabled())
+        if not self.isBusy():
+            self.tap(*tap)
+        # Repeated reveals of one cell collapse into one, every flag tap toggles
+        elif tap[2] or tap not in self.queued_taps:
+            self.queued_taps.append(tap)
+
+    def playReplay(self, path: str, speed: float = 1.0):
+        """Re-drives a recorded Game on this Board, at the recorded pace divided by speed or at once if speed is None"""
+        header, records = readReplay(path)
+        self.newGame(header["width"], header["height"], header["bomb_count"], header["topology"])
+        if header["layout"] == LAYOUT_SEED:
+            self.model.seed = header["seed"]
+        else:
+            self.model.setMines(header["mines"])
+            self.model.first_reveal = False
+        self.replay_records = records.tolist()
+        self.replay_index = 0
+        self.replay_speed = speed
+        self.replay_event = Clock.schedule_once(self.replayStep, 0)
+
+    def replayStep(self, dt = 0):
+        """Clock callback, performs the recorded actions that are due and schedules the next one"""
+        records = self.replay_records
+        while self.replay_index < len(records):
+            _, x, y, action = records[self.replay_index]
+            self.replay_index += 1
+            self.perform(action, x, y)
+            if self.replay_event is None:
+                return
+            if self.replay_index < len(records) and self.replay_speed is not None:
+                self.replay_event = Clock.schedule_once(self.replayStep, records[self.replay_index][0] / 1000 / self.replay_speed)
+                return
+        self.replay_event = None
+
+    def stopReplay(self):
+        """Stops a running replay"""
+        if self.replay_event is not None:
+            self.replay_event.cancel()
+            self.replay_event = None
+
+    def isRunning(self) -> bool:
+        """Returns if a Game is started, not over and not a replay"""
+        model = self.model
+        return not model.first_reveal and not model.lost and not model.won and self.replay_event is None
+
+    def saveState(self, path: str):
+        """Writes a snapshot of a running Game or removes a stale one"""
+        self.settleMove()
+        if self.isRunning():
+            saveSnapshot(path, self.model, self.tool_bar.status_label.getElapsed(), self.last_replay, self.practice)
+        elif os.path.exists(path):
+            os.remove(path)
+
+    def restoreState(self, snapshot: dict):
+        """Continues a Game from a snapshot, redrawing every cell once"""
+        resized = ((snapshot["width"], snapshot["height"], snapshot["topology"])
+                   != (self.model.width, self.model.height, self.model.topology_name))
+        self.queued_taps = []
+        self.settleMove(discard = True)
+        self.stopReplay()
+        self.stopRecording()
+        restoreSnapshot(self.model, snapshot)
+        self.solver.reset()
+        ys, xs = np.nonzero(self.model.revealed)
+        self.solver.update(zip(xs.tolist(), ys.tolist()))
+        self.clearMarker()
+        # The history of a resumed Game starts at the snapshot
+        self.practice = snapshot["practice"]
+        self.startHistory()
+        self.tool_bar.status_label.restore(snapshot["elapsed"])
+        self.tool_bar.status_label.bomb_count = self.model.flags_remaining
+        self.last_replay = snapshot["replay_path"]
+        if self.last_replay is not None and os.path.exists(self.last_replay):
+            self.recorder = GameRecorder(self.last_replay, self.model, resume = True)
+        layout_cache.pause(not self.model.first_reveal)
+        if resized:
+            self.buildMeshes()
+        else:
+            self.refresh()
+        self.updateHeatmap()
+
+    def winCheck(self):
+        """Checks, if Progress is 0"""
+        if self.model.won:
+            self.win()
+
+    def addUndoButton(self, game: Popup, layout: BoxLayout):
+        """Adds a Button that takes back the losing move of a practice Game to the Game Over Popup"""
+        if not self.practice:
+            return
+        undo = Button(text = "Undo", size_hint_y = 0.1)
+        undo.bind(on_release = lambda x: [game.dismiss(x), self.undo()])
+        undo.background_normal = "normal.png"
+        undo.background_down = "down.png"
+        undo.color = (0,0,0,1)
+        undo.background_color = (.8,.8,.8,1)
+        layout.add_widget(undo)
+
+    def addReplayButton(self, game: Popup, layout: BoxLayout):
+        """Adds a Button that replays the last recorded Game to a Game End Popup"""
+        if self.last_replay is None:
+            return
+        path = self.last_replay
+        replay = Button(text = "Replay", size_hint_y = 0.1)
+        replay.bind(on_release = lambda x: [game.dismiss(x), self.playReplay(path)])
+        replay.background_normal = "normal.png"
+        replay.background_down = "down.png"
+        replay.color = (0,0,0,1)
+        replay.background_color = (.8,.8,.8,1)
+        layout.add_widget(replay)
+
+    def lose(self):
+        """Game Over function"""
+        self.model.revealAll()
+        self.refresh()
+        self.hideOverlay()
+        self.tool_bar.status_label.stopTimer()
+        self.stopReplay()
+        self.stopRecording()
+        layout_cache.pause(False)
+        layout = BoxLayout(orientation = "vertical")
+        game = Popup(title = "Game Over", content = layout, size_hint_y = 0.2, size_hint_x = 0.35, title_align = "center")
+
+        back = Button(text = "Restart", size_hint_y = 0.1)
+        back.bind(on_release = lambda x: [game.dismiss(x), self.restart()])
+        back.background_normal = "normal.png"
+        back.background_down = "down.png"
+        back.color = (0,0,0,1)
+        back.background_color = (.8,.8,.8,1)
+
+        layout.add_widget(back)
+        self.addUndoButton(game, layout)
+        self.addReplayButton(game, layout)
+
+        game.open()
+
+    
+    def win(self):
+        """Game Won function"""
+        model = self.model
+        replayed = self.replay_event is not None
+        model.revealAll()
+        self.refresh()
+        self.hideOverlay()
+        status_label = self.tool_bar.status_label
+        status_label.stopTimer()
+        self.stopReplay()
+        self.stopRecording()
+        layout_cache.pause(False)
+        score = status_label.getScore(model.width, model.height, model.bomb_count)
+        app = App.get_running_app()
+        title = f"You Won! Score: {score}"
+        # Variants are neither ranked with the square Boards of their size nor analyzed, which assumes square cells
+        if model.topology_name == "square":
+            if app is not None and not replayed and not self.practice:
+                app.openHighscores().add(model.width, model.height, model.bomb_count, status_label.getElapsed(), score, model.seed, self.last_replay)
+            # Clicks per second the board needed at least, comparable across boards unlike the score
+            rate = analyze(model.mines)["3bv"] / max(status_label.getElapsed(), 0.1)
+            title += f", 3BV/s: {rate:.2f}"
+        layout = BoxLayout(orientation = "vertical")
+        game = Popup(title = title, content = layout, size_hint_y = 0.2, size_hint_x = 0.35, title_align = "center")
+
+        back = Button(text = "Restart", size_hint_y = 0.1)
+        back.bind(on_release = lambda x: [game.dismiss(x), self.restart()])
+        back.background_normal = "normal.png"
+        back.background_down = "down.png"
+        back.color = (0,0,0,1)
+        back.background_color = (.8,.8,.8,1)
+
+        layout.add_widget(back)
+        self.addReplayButton(game, layout)
+
+        game.open()
+
+
+class EndlessGameBoard(BoardView):
+    """Draws a scrollable window onto an endless, chunked Board and handles the Game"""
+    # Cells across the window, the rows follow from its aspect ratio
+    CELLS_ACROSS = 16
+
+    def __init__(self, tool_bar: ToolBar, density: float = 0.18, **kwargs):
+        """Endless Game Board init"""
+        self.tool_bar = tool_bar
+        app = App.get_running_app()
+        path = os.path.join(app.user_data_dir, "endless.sqlite3") if app is not None else ":memory:"
+        self.world = EndlessWorld(path, density)
+        super().__init__(Viewport(self.world, self.CELLS_ACROSS, self.CELLS_ACROSS), **kwargs)
+        # The solvers need a finite Board
+        for button in (tool_bar.hint, tool_bar.auto_flag, tool_bar.undo, tool_bar.redo, tool_bar.odds):
+            tool_bar.remove_widget(button)
+        tool_bar.status_label.counter_name = "Cleared"
+
+    def restart(self):
+        """Starts a new world"""
+        self.world.reset()
+        self.tool_bar.reset()
+        self.model.center()
+        self.refresh()
+
+    def layoutCells(self, *args):
+        """Fits the visible rows to the widget, then positions the cells"""
+        if self.width > 0:
+            rows = max(int(round(self.CELLS_ACROSS * self.height / self.width)), 1)
+            if rows != self.model.height:
+                self.model.resize(self.CELLS_ACROSS, rows)
+                # lays the cells out again
+                self.buildMeshes()
+                return
+        super().layoutCells(*args)
+
+    def on_touch_move(self, touch):
+        """Scrolls the window by whole cells while dragging"""
+        if touch.grab_current is not self:
+            return super().on_touch_move(touch)
+        if self.cell_size <= 0:
+            return True
+        columns = int((touch.x - touch.ox) / self.cell_size)
+        rows = int((touch.y - touch.oy) / self.cell_size)
+        if abs(touch.x - touch.ox) > self.cell_size / 2 or abs(touch.y - touch.oy) > self.cell_size / 2:
+            touch.ud["dragged"] = True
+        scrolled_columns, scrolled_rows = touch.ud.get("scrolled", (0, 0))
+        if (columns, rows) != (scrolled_columns, scrolled_rows):
+            # The Board follows the finger, world rows grow downwards
+            self.model.scroll(scrolled_columns - columns, rows - scrolled_rows)
+            touch.ud["scrolled"] = (columns, rows)
+            self.refresh()
+        return True
+
+    def on_touch_up(self, touch):
+        if touch.grab_current is self and touch.ud.get("dragged"):
+            touch.ungrab(self)
+            return True
+        return super().on_touch_up(touch)
+
+    def on_cell_release(self, x: int, y: int):
+        """Reveals, flags or chords the tapped cell"""
+        world = self.world
+        world_x, world_y = self.model.toWorld(x, y)
+        status_label = self.tool_bar.status_label
+        if self.tool_bar.isFlaggingEnabled():
+            changed = world.flag(world_x, world_y)
+        elif self.model.revealed[y, x]:
+            changed = world.chord(world_x, world_y)
+        else:
+            if world.first_reveal:
+                status_label.startTimer()
+            changed = world.reveal(world_x, world_y)
+        if not changed:
+            return
+        # Chunks are only evicted between moves
+        world.trim()
+        self.model.load()
+        self.refresh()
+        status_label.bomb_count = world.cleared
+        if world.lost:
+            self.lose()
+
+    def lose(self):
+        """Game Over function"""
+        self.tool_bar.status_label.stopTimer()
+        layout = BoxLayout(orientation = "vertical")
+        game = Popup(title = f"Game Over, {self.world.cleared} cells cleared", content = layout, size_hint_y = 0.2, size_hint_x = 0.35, title_align = "center")
+
+        back = Button(text = "Restart", size_hint_y = 0.1)
+        back.bind(on_release = lambda x: [game.dismiss(x), self.restart()])
+        back.background_normal = "normal.png"
+        back.background_down = "down.png"
+        back.color = (0,0,0,1)
+        back.background_color = (.8,.8,.8,1)
+
+        layout.add_widget(back)
+        game.open()
+
+
+class ProfilerPanel(Label):
+    """Shows the measurements of the hot paths and frame times while profiling"""
+    def __init__(self, **kwargs):
+        """Profiler Panel init"""
+        super().__init__(**kwargs)
+        self.size_hint_y = 0.3
+        self.font_size = "11sp"
+        self.halign = "left"
+        self.valign = "top"
+        self.bind(size = lambda label, size: setattr(label, "text_size", size))
+        self.frame_event = None
+        self.update_event = None
+
+    def show(self, layout: BoxLayout):
+        """Enables the profiler and shows the panel above the Board"""
+        profiler.enable()
+        self.text = ""
+        layout.add_widget(self, index = 1)
+        self.frame_event = Clock.schedule_interval(profiler.frame, 0)
+        self.update_event = Clock.schedule_interval(self.update, 0.5)
+
+    def update(self, dt = 0):
+        """Shows the current measurements"""
+        self.text = profiler.summary()
+
+    def hide(self):
+        """Disables the profiler, removes the panel and exports the session as Chrome trace"""
+        self.frame_event.cancel()
+        self.update_event.cancel()
+        profiler.disable()
+        if self.parent is not None:
+            self.parent.remove_widget(self)
+        trace_dir = os.path.join(App.get_running_app().user_data_dir, "traces")
+        os.makedirs(trace_dir, exist_ok = True)
+        path = os.path.join(trace_dir, time.strftime("trace-%Y%m%d-%H%M%S.json"))
+        profiler.exportTrace(path)
+        Logger.info(f"Profiler: trace written to {path}")
+
+
+# Hot paths timed while profiling, the wrappers only exist while the profiler is enabled
+profiler = Profiler()
+for owner, attribute, label, count_result in (
+        (Topology, "count", "countNeighbours", False),
+        (BoardModel, "neighbours", "neighbours", False),
+        (BoardModel, "cascade", "cascade", True),
+        (BoardModel, "revealAll", "revealAll", False),
+        (BoardView, "refresh", "refresh", False),
+        (BoardView, "updateCells", "updateCells", False),
+        (BoardView, "flushMeshes", "flushMeshes", False),
+        (BoardView, "buildMeshes", "buildMeshes", False),
+        (HintSolver, "solve", "solve", False),
+        (ProbabilityMap, "compute", "heatmap", False),
+        (GameBoard, "newGame", "restart", False),
+        (GameBoard, "computeMove", "move worker", False),
+        (GameBoard, "drawStep", "reveal slice", False),
+        (EndlessWorld, "cascade", "endless cascade", True),
+        (EndlessWorld, "trim", "chunk eviction", False)):
+    profiler.register(owner, attribute, label, count_result)
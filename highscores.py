@@ -0,0 +1,117 @@
+import queue
+import sqlite3
+import threading
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    width INTEGER NOT NULL,
+    height INTEGER NOT NULL,
+    bombs INTEGER NOT NULL,
+    time REAL NOT NULL,
+    score INTEGER NOT NULL,
+    played_at REAL NOT NULL,
+    seed TEXT,
+    replay TEXT
+);
+CREATE INDEX IF NOT EXISTS games_configuration ON games (width, height, bombs, time);
+CREATE INDEX IF NOT EXISTS games_time ON games (time);
+CREATE TABLE IF NOT EXISTS bests (
+    width INTEGER NOT NULL,
+    height INTEGER NOT NULL,
+    bombs INTEGER NOT NULL,
+    time REAL NOT NULL,
+    score INTEGER NOT NULL,
+    games INTEGER NOT NULL,
+    last_played REAL NOT NULL,
+    PRIMARY KEY (width, height, bombs)
+);
+"""
+
+# Keeps bests up to date in the insert transaction, so reading them never has to aggregate all games
+UPSERT_BEST = """
+INSERT INTO bests (width, height, bombs, time, score, games, last_played) VALUES (?, ?, ?, ?, ?, 1, ?)
+ON CONFLICT (width, height, bombs) DO UPDATE SET
+    score = CASE WHEN excluded.time < time THEN excluded.score ELSE score END,
+    time = MIN(time, excluded.time),
+    games = games + 1,
+    last_played = excluded.last_played
+"""
+
+
+def connect(path: str) -> sqlite3.Connection:
+    """Opens the database in WAL mode, where the writer never blocks readers"""
+    connection = sqlite3.connect(path)
+    connection.execute("PRAGMA journal_mode = WAL")
+    connection.execute("PRAGMA synchronous = NORMAL")
+    return connection
+
+
+class HighscoreStore:
+    """Stores won games in SQLite, inserts run on a writer thread so the UI never waits for the disk"""
+    def __init__(self, path: str, on_saved = None):
+        """Highscore Store init, on_saved is called from the writer thread after every committed batch"""
+        self.path = path
+        self.on_saved = on_saved
+        # Reads run on the thread that created the store, over their own connection
+        self.connection = connect(path)
+        self.connection.executescript(SCHEMA)
+        self.pending = queue.Queue()
+        self.writer = threading.Thread(target = self.writeLoop, name = "highscores", daemon = True)
+        self.writer.start()
+
+    def add(self, width: int, height: int, bombs: int, elapsed: float, score: int, seed: int = None, replay: str = None):
+        """Queues a won game for insertion, returns immediately"""
+        # seeds are unsigned 64 bit, more than an SQLite integer holds
+        self.pending.put((width, height, bombs, elapsed, score, time.time(), None if seed is None else f"{seed:016x}", replay))
+
+    def writeLoop(self):
+        """Writer thread, inserts every queued game and commits them in batches"""
+        connection = connect(self.path)
+        while True:
+            batch = [self.pending.get()]
+            while not self.pending.empty():
+                batch.append(self.pending.get())
+            closing = None in batch
+            games = [game for game in batch if game is not None]
+            if games:
+                try:
+                    with connection:
+                        connection.executemany(
+                            "INSERT INTO games (width, height, bombs, time, score, played_at, seed, replay) "
+                            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", games)
+                        connection.executemany(UPSERT_BEST, [game[:6] for game in games])
+                except sqlite3.Error:
+                    # A failed batch is rolled back and dropped, the writer keeps serving later games
+                    pass
+                else:
+                    if self.on_saved is not None:
+                        self.on_saved()
+            if closing:
+                connection.close()
+                return
+
+    def top(self, width: int, height: int, bombs: int, count: int = 10):
+        """Returns the (time, score, played_at) of the fastest games of a configuration"""
+        return self.connection.execute(
+            "SELECT time, score, played_at FROM games WHERE width = ? AND height = ? AND bombs = ? "
+            "ORDER BY time LIMIT ?", (width, height, bombs, count)).fetchall()
+
+    def bests(self, count: int = 10):
+        """Returns the (width, height, bombs, time, score, games) personal bests of the latest played configurations"""
+        return self.connection.execute(
+            "SELECT width, height, bombs, time, score, games FROM bests ORDER BY last_played DESC LIMIT ?",
+            (count,)).fetchall()
+
+    def bestReplays(self) -> set:
+        """Returns the replay paths of the fastest game of every configuration"""
+        return {row[0] for row in self.connection.execute(
+            "SELECT games.replay FROM bests JOIN games ON games.width = bests.width AND games.height = bests.height "
+            "AND games.bombs = bests.bombs AND games.time = bests.time WHERE games.replay IS NOT NULL")}
+
+    def close(self):
+        """Writes the queued games and closes the database"""
+        self.pending.put(None)
+        self.writer.join()
+        self.connection.close()
@@ -0,0 +1,133 @@
+import numpy as np
+from board import BoardModel
+from solver import HintSolver
+
+# Moves and changed cells after which the solver state is checkpointed, an undo replays at most that much into it
+CHECKPOINT_INTERVAL = 32
+CHECKPOINT_CELLS = 4096
+NO_CELLS = np.zeros(0, dtype=np.int32)
+
+
+class Move:
+    """What one move changed: the flat cells it revealed, the flags it toggled and the counters before and after it"""
+    __slots__ = ("revealed", "flagged", "before", "after")
+
+    def __init__(self, revealed: np.ndarray, flagged: np.ndarray, before: tuple, after: tuple):
+        """Move init"""
+        self.revealed = revealed
+        self.flagged = flagged
+        self.before = before
+        self.after = after
+
+
+class MoveHistory:
+    """Unlimited undo and redo for the moves on a Board Model, every move stores only the cells it changed
+
+    The Board Model journals its changes while the history listens. Everything journaled between two commits becomes
+    one move, so a reveal and the flags and Game Over reveal following it are undone together.
+    """
+    def __init__(self, model: BoardModel, solver: HintSolver, checkpoint_interval: int = CHECKPOINT_INTERVAL):
+        """Move History init, not listening until reset"""
+        self.model = model
+        self.solver = solver
+        self.checkpoint_interval = checkpoint_interval
+        self.moves = []
+        self.position = 0
+        self.counters = None
+        self.checkpoints = {}
+
+    def getCounters(self) -> tuple:
+        """Returns the counters of the Board Model a move changes"""
+        model = self.model
+        return (model.progress, model.flags_remaining, model.lost, model.first_reveal)
+
+    def reset(self):
+        """Forgets every move and listens to the Board Model from its current state on"""
+        self.moves = []
+        self.position = 0
+        self.counters = self.getCounters()
+        # Solver state by the amount of moves played before it
+        self.checkpoints = {0: self.solver.checkpoint()}
+        self.model.journal = ([], [])
+
+    def stop(self):
+        """Forgets every move and stops listening"""
+        self.moves = []
+        self.position = 0
+        self.checkpoints = {}
+        self.model.journal = None
+
+    def commit(self):
+        """Turns the changes journaled since the last commit into a move, dropping the moves that could be redone"""
+        model = self.model
+        journal = model.journal
+        if journal is None:
+            return
+        model.journal = ([], [])
+        revealed = np.concatenate([np.asarray(cells, dtype=np.int32) for cells in journal[0]] or [NO_CELLS])
+        # A flag toggled twice within one move cancels out
+        cells, toggles = np.unique(np.asarray(journal[1], dtype=np.int32), return_counts=True)
+        flagged = cells[toggles % 2 == 1]
+        if len(revealed) == 0 and len(flagged) == 0:
+            return
+        del self.moves[self.position:]
+        for position in [position for position in self.checkpoints if position > self.position]:
+            del self.checkpoints[position]
+        after = self.getCounters()
+        self.moves.append(Move(revealed, flagged, self.counters, after))
+        self.counters = after
+        self.position += 1
+        start = max(self.checkpoints)
+        cells = sum(len(move.revealed) + len(move.flagged) for move in self.moves[start:])
+        if self.position - start >= self.checkpoint_interval or cells >= CHECKPOINT_CELLS:
+            self.checkpoints[self.position] = self.solver.checkpoint()
+
+    def canUndo(self) -> bool:
+        """Returns if there is a move to take back, the first reveal placed the bombs and is never taken back"""
+        if self.model.journal is None:
+            return False
+        self.commit()
+        return self.position > 0 and not self.moves[self.position - 1].before[3]
+
+    def canRedo(self) -> bool:
+        """Returns if there is a taken back move to play again"""
+        if self.model.journal is None:
+            return False
+        self.commit()
+        return self.position < len(self.moves)
+
+    def undo(self) -> np.ndarray:
+        """Takes back the last move, returns the flat cells it changed or None if there is nothing to undo"""
+        if not self.canUndo():
+            return None
+        self.position -= 1
+        return self.apply(self.moves[self.position], False)
+
+    def redo(self) -> np.ndarray:
+        """Plays the last taken back move again, returns the flat cells it changed or None if there is none"""
+        if not self.canRedo():
+            return None
+        self.position += 1
+        return self.apply(self.moves[self.position - 1], True)
+
+    def apply(self, move: Move, forward: bool) -> np.ndarray:
+        """Sets the cells and counters of a move as after it or, if not forward, as before it"""
+        model = self.model
+        model.revealed.reshape(-1)[move.revealed] = forward
+        flags = model.flags.reshape(-1)
+        flags[move.flagged] = ~flags[move.flagged]
+        cells = np.concatenate((move.revealed, move.flagged))
+        model.syncBlocked(cells)
+        self.counters = move.after if forward else move.before
+        model.progress, model.flags_remaining, model.lost, model.first_reveal = self.counters
+        self.rewindSolver()
+        return cells
+
+    def rewindSolver(self):
+        """Restores the solver from the last checkpoint and replays the few moves since into it"""
+        start = max(position for position in self.checkpoints if position <= self.position)
+        self.solver.restore(self.checkpoints[start])
+        width = self.model.width
+        for move in self.moves[start:self.position]:
+            ys, xs = np.divmod(np.concatenate((move.revealed, move.flagged)), width)
+            self.solver.update(zip(xs.tolist(), ys.tolist()))
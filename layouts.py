@@ -0,0 +1,123 @@
+import random
+import threading
+from collections import deque
+from board import BoardModel
+import noguess
+
+# Seconds one background search for a no-guess layout may take
+SEARCH_BUDGET = 5.0
+# Failed searches in a row after which a configuration is given up, e.g. when it is too dense to be solvable
+MAX_FAILURES = 3
+
+
+class Layout:
+    """A ready Board: the seed, the cell it starts from and its bombs, counts and the opening of the start cell"""
+    __slots__ = ("seed", "start", "mines", "counts", "opening")
+
+    def __init__(self, seed: int, start: "tuple[int, int]", mines, counts, opening):
+        """Layout init"""
+        self.seed = seed
+        self.start = start
+        self.mines = mines
+        self.counts = counts
+        self.opening = opening
+
+
+def prepareLayout(width: int, height: int, bomb_count: int, topology: str = "square", stop=None) -> Layout:
+    """Searches a no-guess Board starting from a random cell, returns None if none is found in the budget
+
+    stop is called between the seeds checked and ends the search once it returns True.
+    """
+    start = (random.randrange(width), random.randrange(height))
+    seed, found = noguess.findNoGuessSeed(width, height, bomb_count, start, SEARCH_BUDGET, topology, stop)
+    if not found:
+        return None
+    # The same bombs the Board Model places for the seed when the start cell is revealed first
+    model = BoardModel(width, height, bomb_count, seed, topology)
+    model.reveal(*start)
+    return Layout(seed, start, model.mines, model.counts, model.revealed)
+
+
+class LayoutCache:
+    """Keeps ready no-guess layouts of one Board configuration, prepared on a background thread
+
+    Every layout starts from a random cell, so the more are kept the more likely one opens the cell the player taps first.
+    """
+    def __init__(self, size: int = 6):
+        """Layout Cache init, holds at most size layouts"""
+        self.size = size
+        # (width, height, bomb_count, topology) the layouts are prepared for, None while idle
+        self.configuration = None
+        self.layouts = deque()
+        self.failures = 0
+        # No search runs while a Game is played, the searches would take the CPU from it
+        self.paused = False
+        self.condition = threading.Condition()
+        self.thread = None
+
+    def configure(self, configuration):
+        """Prepares layouts of a (width, height, bomb_count, topology) configuration from now on, dropping those of another one"""
+        with self.condition:
+            if configuration == self.configuration:
+                return
+            self.configuration = configuration
+            self.layouts.clear()
+            self.failures = 0
+            self.condition.notify()
+        if self.thread is None and configuration is not None:
+            self.thread = threading.Thread(target = self.fillLoop, name = "layouts", daemon = True)
+            self.thread.start()
+
+    def peek(self, configuration) -> Layout:
+        """Returns the ready layout of the configuration that take prefers, without taking it, or None"""
+        with self.condition:
+            if configuration != self.configuration or not self.layouts:
+                return None
+            return self.layouts[0]
+
+    def take(self, configuration, cell: "tuple[int, int]" = None) -> Layout:
+        """Returns a ready layout of the configuration whose opening holds the (x, y) cell, any one without a cell, or None
+
+        The thread prepares a replacement.
+        """
+        with self.condition:
+            if configuration != self.configuration:
+                return None
+            for layout in self.layouts:
+                if cell is None or layout.opening[cell[1], cell[0]]:
+                    self.layouts.remove(layout)
+                    self.condition.notify()
+                    return layout
+            return None
+
+    def pause(self, paused: bool = True):
+        """Stops the searches while a Game is played, a running one within one seed, or starts them again"""
+        with self.condition:
+            self.paused = paused
+            self.condition.notify()
+
+    def isIdle(self) -> bool:
+        """Returns if there is nothing to prepare"""
+        return (self.paused or self.configuration is None or len(self.layouts) >= self.size
+                or self.failures >= MAX_FAILURES)
+
+    def fillLoop(self):
+        """Background thread, tops the layouts of the current configuration up to the cache size"""
+        while True:
+            with self.condition:
+                while self.isIdle():
+                    self.condition.wait()
+                configuration = self.configuration
+            layout = prepareLayout(*configuration, stop = lambda: self.paused or configuration != self.configuration)
+            with self.condition:
+                # Dropped if the configuration changed during the search, a paused one is no failure
+                if configuration != self.configuration or (layout is None and self.paused):
+                    continue
+                if layout is None:
+                    self.failures += 1
+                else:
+                    self.failures = 0
+                    self.layouts.append(layout)
+
+
+layout_cache = LayoutCache()
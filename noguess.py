@@ -0,0 +1,98 @@
+import os
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from board import BoardModel
+from solver import HintSolver
+
+# Seeds every pool task checks before reporting back
+CHUNK_SIZE = 8
+WORKERS = os.cpu_count() or 1
+_pool = None
+# The layouts thread and the Game worker both ask for the pool, only one of them may start it
+_pool_lock = threading.Lock()
+
+
+def isSolvable(width: int, height: int, bomb_count: int, seed: int, first: "tuple[int, int]",
+               topology: str = "square") -> bool:
+    """Returns if the board of the seed can be cleared from the first revealed cell without guessing"""
+    model = BoardModel(width, height, bomb_count, seed, topology)
+    solver = HintSolver(model)
+    solver.update(model.reveal(*first))
+    while True:
+        safe, mines = solver.solve()
+        if not safe:
+            break
+        for x, y in list(safe):
+            if not model.revealed[y, x]:
+                solver.update(model.reveal(x, y))
+    # Once every bomb is deduced the remaining concealed cells are safe as well
+    return len(solver.mines) == model.bomb_count or bool((model.revealed | model.mines).all())
+
+
+def findInChunk(width: int, height: int, bomb_count: int, seeds, first: "tuple[int, int]", topology: str = "square"):
+    """Returns the first seed of the chunk whose board is solvable without guessing or None"""
+    for seed in seeds:
+        if isSolvable(width, height, bomb_count, seed, first, topology):
+            return seed
+    return None
+
+
+def getPool():
+    """Returns the shared process pool, or None where processes are not available (e.g. on Android)"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            try:
+                _pool = ProcessPoolExecutor(max_workers=WORKERS)
+            except (ImportError, NotImplementedError, OSError):
+                _pool = False
+    return _pool or None
+
+
+def warmUp():
+    """Starts the pool processes ahead of time so the first search does not pay for them"""
+    pool = getPool()
+    if pool is not None:
+        for _ in range(WORKERS):
+            pool.submit(int)
+
+
+def findNoGuessSeed(width: int, height: int, bomb_count: int, first: "tuple[int, int]", time_budget: float = 0.8,
+                    topology: str = "square", stop=None):
+    """Searches a seed whose board is solvable without guessing within the time budget
+
+    Returns (seed, True) on success, or (seed, False) with an unchecked random seed once the budget is used up or the
+    stop function, called between seeds, returns True.
+    """
+    deadline = time.monotonic() + time_budget
+    next_seed = random.getrandbits(63)
+    fallback = next_seed
+    pool = getPool()
+
+    if pool is None:
+        while time.monotonic() < deadline and not (stop and stop()):
+            if isSolvable(width, height, bomb_count, next_seed, first, topology):
+                return next_seed, True
+            next_seed += 1
+        return fallback, False
+
+    pending = set()
+    try:
+        while True:
+            while len(pending) < 2*WORKERS:
+                seeds = range(next_seed, next_seed + CHUNK_SIZE)
+                pending.add(pool.submit(findInChunk, width, height, bomb_count, seeds, first, topology))
+                next_seed += CHUNK_SIZE
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or (stop and stop()):
+                return fallback, False
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                seed = future.result()
+                if seed is not None:
+                    return seed, True
+    finally:
+        for future in pending:
+            future.cancel()
@@ -0,0 +1,403 @@
+import math
+import time
+from collections import OrderedDict
+import numpy as np
+from board import BoardModel
+
+# Components with more cells are not solved, their cells keep the probabilities of the last compute (see compute)
+MAX_COMPONENT_CELLS = 600
+# Components whose forward table times their bomb counts fits precompute the bomb ways of every cell and total,
+# larger ones carry the weights of every compute through a backward pass instead
+PRECOMPUTED_FLOATS = 250_000
+# Floats the cached components hold at most
+CACHE_FLOATS = 16_000_000
+
+
+def logBinomial(n: int, k: int) -> float:
+    """Returns log(n choose k), -inf where it is zero"""
+    if k < 0 or k > n:
+        return -math.inf
+    return math.lgamma(n + 1) - math.lgamma(k + 1) - math.lgamma(n - k + 1)
+
+
+def orderCells(cells, constraints):
+    """Orders the cells of a component breadth first from an outermost cell, which keeps few constraints open at once"""
+    linked = {cell: set() for cell in cells}
+    for _, members in constraints:
+        for cell in members:
+            linked[cell].update(members)
+    start = min(cells, key=lambda cell: (len(linked[cell]), cell))
+    order = [start]
+    seen = {start}
+    for cell in order:
+        for other in sorted(linked[cell] - seen):
+            seen.add(other)
+            order.append(other)
+    return order
+
+
+def stateGraph(size: int, constraints, deadline: float = None):
+    """Returns the layers of the state graph of a component, None once the deadline passed
+
+    The constraints are (count, local cell indices). Cells are assigned in index order, a state of layer i holds the
+    partial sums of the constraints open between cell i - 1 and cell i. Layer i is a (2, states) array with the state
+    of layer i + 1 every state reaches if cell i is empty or a bomb, -1 where that breaks a constraint. Only states on
+    a complete assignment are kept, so an unsatisfiable component has no layers.
+    """
+    counts = np.array([count for count, _ in constraints], dtype=np.int16)
+    last = [max(cells) for _, cells in constraints]
+    starting = [[] for _ in range(size)]
+    containing = [[] for _ in range(size)]
+    for j, (_, cells) in enumerate(constraints):
+        starting[min(cells)].append(j)
+        for i in cells:
+            containing[i].append(j)
+    # cells of every constraint not assigned yet
+    left = np.array([len(cells) for _, cells in constraints], dtype=np.int16)
+
+    # One sweep over the cells, the open constraints are the columns of the states
+    columns = []
+    states = np.zeros((1, 0), dtype=np.int16)
+    layers = []
+    for i in range(size):
+        if deadline is not None and time.perf_counter() > deadline:
+            return None
+        touched = columns + starting[i]
+        position = {j: k for k, j in enumerate(touched)}
+        member = np.zeros(len(touched), dtype=np.int16)
+        for j in containing[i]:
+            member[position[j]] = 1
+            left[j] -= 1
+        limit = counts[touched]
+        rest = left[touched]
+        sums = np.zeros((len(states), len(touched)), dtype=np.int16)
+        sums[:, :len(columns)] = states
+        # empty then bomb for every state, a constraint must still be reachable with the cells it has left
+        candidates = np.concatenate((sums, sums + member))
+        valid = ((candidates <= limit) & (candidates + rest >= limit)).all(axis=1)
+        columns = [j for j in touched if last[j] != i]
+        kept = [last[j] != i for j in touched]
+        states, inverse = np.unique(candidates[valid][:, kept], axis=0, return_inverse=True)
+        targets = np.full(len(candidates), -1, dtype=np.intp)
+        targets[valid] = inverse.ravel()
+        layers.append(targets.reshape((2, -1)))
+        if len(states) == 0:
+            return []
+
+    # Drops the states no complete assignment passes, from the back
+    alive = np.ones(1, dtype=bool)
+    for i in range(size - 1, -1, -1):
+        targets = layers[i]
+        reached = targets >= 0
+        reached[reached] = alive[targets[reached]]
+        renumbered = np.cumsum(alive) - 1
+        targets = np.where(reached, renumbered[np.maximum(targets, 0)], -1)
+        alive = reached.any(axis=0)
+        layers[i] = targets[:, alive]
+    return layers if alive.any() else []
+
+
+def windows(offset: int, width: int, target_offset: int, target_width: int):
+    """Returns the column slices where a row of bomb counts from offset lands in a row starting at target_offset"""
+    start = max(target_offset - offset, 0)
+    stop = max(min(target_offset + target_width - offset, width), start)
+    return slice(start, stop), slice(start + offset - target_offset, stop + offset - target_offset)
+
+
+class Component:
+    """The bomb assignments of one independent group of constraints, counted over the layers of its state graph
+
+    Every state keeps its ways by the bombs placed so far, only for the bomb counts it can be reached with. ways[k]
+    times exp(scale) is the amount of complete assignments with k bombs, trimmed to the bomb counts the component can
+    hold. mine_ways[i, k] are those where cell i is a bomb, precomputed for components small enough.
+    """
+    __slots__ = ("order", "steps", "offsets", "forward", "scales", "ways", "scale", "mine_ways", "floats")
+
+    def __init__(self, order, layers):
+        """Component init, counts the assignments forward through the layers"""
+        self.order = np.array(order, dtype=np.intp)
+        size = len(order)
+        if not layers:
+            self.ways = np.zeros(1)
+            self.scale = 0.0
+            self.mine_ways = np.zeros((size, 1))
+            self.floats = size
+            return
+
+        # The bomb counts every state can be reached with bound the columns of its layer
+        low = [np.zeros(1, dtype=np.intp)]
+        high = [np.zeros(1, dtype=np.intp)]
+        for i in range(size):
+            states = layers[i + 1].shape[1] if i + 1 < size else 1
+            next_low = np.full(states, size + 1, dtype=np.intp)
+            next_high = np.full(states, -1, dtype=np.intp)
+            for value, targets in enumerate(layers[i]):
+                rows = targets >= 0
+                np.minimum.at(next_low, targets[rows], low[i][rows] + value)
+                np.maximum.at(next_high, targets[rows], high[i][rows] + value)
+            low.append(next_low)
+            high.append(next_high)
+        self.offsets = [int(values.min()) for values in low]
+        widths = [int(values.max()) - offset + 1 for values, offset in zip(high, self.offsets)]
+
+        # (rows, their targets, source columns, target columns) of the empty and the bomb edges of every layer
+        self.steps = []
+        for i in range(size):
+            edges = []
+            for value, targets in enumerate(layers[i]):
+                rows = np.flatnonzero(targets >= 0)
+                edges.append((rows, targets[rows]) + windows(self.offsets[i] + value, widths[i],
+                                                             self.offsets[i + 1], widths[i + 1]))
+            self.steps.append(edges)
+
+        self.forward = [np.ones((1, 1))]
+        self.scales = [0.0]
+        for i, edges in enumerate(self.steps):
+            table = self.forward[i]
+            following = np.zeros((len(low[i + 1]), widths[i + 1]))
+            for rows, targets, source, target in edges:
+                np.add.at(following, (targets[:, None], np.arange(target.start, target.stop)), table[rows, source])
+            peak = following.max()
+            self.forward.append(following / peak)
+            self.scales.append(self.scales[i] + math.log(peak))
+        self.ways = np.zeros(self.offsets[size] + widths[size])
+        self.ways[self.offsets[size]:] = self.forward[size][0]
+        self.scale = self.scales[size]
+
+        self.floats = sum(table.size for table in self.forward)
+        self.mine_ways = None
+        if self.floats*len(self.ways) <= PRECOMPUTED_FLOATS:
+            # Weighting every bomb count on its own yields the bomb ways of every cell and total
+            self.mine_ways = self.backward(np.eye(len(self.ways)))
+            self.steps = self.forward = None
+            self.floats = self.mine_ways.size
+
+    def backward(self, weights: np.ndarray, deadline: float = None) -> np.ndarray:
+        """Returns the weighted ways with every cell being a bomb, relative to ways. None once the deadline passed
+
+        weights[k] weighs the assignments with k bombs, it may have further axes that are carried along. The backward
+        tables hold the weighted ways to complete an assignment from a state and its bombs so far, so a cell is a bomb
+        with the forward ways into a state times the backward ways out of its bomb edge.
+        """
+        size = len(self.order)
+        backward = weights[self.offsets[size]:][None].copy()
+        scale = 0.0
+        bombs = np.zeros((size,) + weights.shape[1:])
+        for i in range(size - 1, -1, -1):
+            if deadline is not None and time.perf_counter() > deadline:
+                return None
+            table = self.forward[i]
+            previous = np.zeros(table.shape + weights.shape[1:])
+            for value, (rows, targets, source, target) in enumerate(self.steps[i]):
+                completions = backward[targets, target]
+                previous[rows, source] += completions
+                if value:
+                    ways = np.tensordot(table[rows, source], completions, axes=2)
+                    bombs[i] = ways*math.exp(self.scales[i] + scale - self.scale)
+            peak = previous.max()
+            if peak > 0:
+                backward = previous / peak
+                scale += math.log(peak)
+        return bombs
+
+    def probabilities(self, weights: np.ndarray, deadline: float = None) -> np.ndarray:
+        """Returns the bomb probability of every cell in order, None once the deadline passed
+
+        weights[k] is the weight of everything outside the component while it holds k bombs.
+        """
+        total = float(self.ways @ weights)
+        if total <= 0:
+            return np.full(len(self.order), np.nan)
+        if self.mine_ways is not None:
+            return (self.mine_ways @ weights) / total
+        bombs = self.backward(weights, deadline)
+        return bombs / total if bombs is not None else None
+
+
+class ProbabilityMap:
+    """Computes the exact bomb probability of every concealed cell from the revealed counts and the total bomb count"""
+    def __init__(self, model: BoardModel, cache_size: int = 1024):
+        """Probability Map init"""
+        self.model = model
+        self.cache_size = cache_size
+        # component signature -> Component
+        self.cache = OrderedDict()
+        self.cached_floats = 0
+        # (seed, probabilities) of the last compute, shown for the components a compute skips
+        self.last = None
+
+    def snapshot(self) -> tuple:
+        """Returns copies of what compute reads of the Board Model, so the compute can run on another thread"""
+        model = self.model
+        return (model.revealed & ~model.mines, ~model.revealed, model.counts, model.topology, model.bomb_count,
+                model.first_reveal, model.seed)
+
+    def solveComponent(self, constraints, deadline: float = None) -> Component:
+        """Returns the counted assignments of one component, cached by its constraints. None once the deadline passed"""
+        signature = tuple(sorted(constraints))
+        cached = self.cache.get(signature)
+        if cached is not None:
+            self.cache.move_to_end(signature)
+            return cached
+
+        cells = sorted({cell for _, members in constraints for cell in members})
+        order = orderCells(cells, constraints)
+        index = {cell: i for i, cell in enumerate(order)}
+        local = [(count, [index[cell] for cell in members]) for count, members in constraints]
+        layers = stateGraph(len(order), local, deadline)
+        if layers is None:
+            return None
+        component = Component(order, layers)
+
+        self.cache[signature] = component
+        self.cached_floats += component.floats
+        while len(self.cache) > self.cache_size or (self.cached_floats > CACHE_FLOATS and len(self.cache) > 1):
+            self.cached_floats -= self.cache.popitem(last=False)[1].floats
+        return component
+
+    def components(self, known: np.ndarray, concealed: np.ndarray, counts: np.ndarray, topology):
+        """Splits the constraints of the revealed cells into independent groups that share no concealed cell
+
+        Cells are flat indices. Cells a single constraint decides (its count is reached, or needs all of its cells)
+        are settled first, which splits the long chains of flagged bombs into small groups. Returns the groups and the
+        {cell: is_mine} settled.
+        """
+        cells = np.flatnonzero(known & (topology.count(concealed) > 0))
+        if len(cells) == 0:
+            return [], {}
+        # The concealed neighbours of all revealed cells at once from the neighbour table
+        lengths = topology.indptr[cells + 1] - topology.indptr[cells]
+        ends = np.cumsum(lengths)
+        positions = np.arange(ends[-1]) + np.repeat(topology.indptr[cells] - (ends - lengths), lengths)
+        neighbours = topology.indices[positions]
+        inside = concealed.reshape(-1)[neighbours]
+        bounds = np.concatenate(([0], np.cumsum(inside)[ends - 1])).tolist()
+        members = neighbours[inside].tolist()
+        constraints = [[count, members[start:stop]]
+                       for count, start, stop in zip(counts.reshape(-1)[cells].tolist(), bounds, bounds[1:])]
+        containing = {}
+        for j, (_, cells_of) in enumerate(constraints):
+            for cell in cells_of:
+                containing.setdefault(cell, []).append(j)
+
+        forced = {}
+        pending = list(range(len(constraints)))
+        while pending:
+            count, cells_of = constraints[pending.pop()]
+            if not cells_of or 0 < count < len(cells_of):
+                continue
+            is_mine = count > 0
+            for cell in list(cells_of):
+                forced[cell] = is_mine
+                for j in containing[cell]:
+                    constraints[j][1].remove(cell)
+                    constraints[j][0] -= is_mine
+                    pending.append(j)
+
+        parent = {}
+
+        def find(cell):
+            while parent[cell] != cell:
+                parent[cell] = parent[parent[cell]]
+                cell = parent[cell]
+            return cell
+
+        groups = {}
+        remaining = [(count, tuple(cells_of)) for count, cells_of in constraints if cells_of]
+        for _, cells_of in remaining:
+            for cell in cells_of:
+                parent.setdefault(cell, cell)
+            root = find(cells_of[0])
+            for cell in cells_of[1:]:
+                other = find(cell)
+                if other != root:
+                    parent[other] = root
+        for constraint in remaining:
+            groups.setdefault(find(constraint[1][0]), []).append(constraint)
+        return list(groups.values()), forced
+
+    def compute(self, snapshot: tuple = None, budget: float = None) -> np.ndarray:
+        """Returns the bomb probability of every cell, NaN for revealed cells
+
+        Reads the Board Model unless given a snapshot of it. Components too large to solve, or left when the budget in
+        seconds runs out, count as unconstrained cells for the others and keep their last probabilities, NaN if none.
+        """
+        deadline = time.perf_counter() + budget if budget is not None else None
+        known, concealed, counts, topology, bomb_count, first_reveal, seed = snapshot or self.snapshot()
+        probabilities = np.full(concealed.shape, np.nan)
+        if first_reveal:
+            probabilities[:] = bomb_count / concealed.size
+            return probabilities
+        flat = probabilities.reshape(-1)
+
+        groups, forced = self.components(known, concealed, counts, topology)
+        if forced:
+            flat[list(forced)] = list(forced.values())
+            bomb_count -= sum(forced.values())
+        # Smaller components first, so a budget running out skips the large ones
+        groups.sort(key=len)
+        solved = []
+        skipped = []
+        for constraints in groups:
+            cells = {cell for _, members in constraints for cell in members}
+            component = None
+            if len(cells) <= MAX_COMPONENT_CELLS:
+                component = self.solveComponent(constraints, deadline)
+            if component is None:
+                skipped.append(list(cells))
+            else:
+                solved.append(component)
+        unconstrained = concealed.copy().reshape(-1)
+        unconstrained[list(forced)] = False
+        for component in solved:
+            unconstrained[component.order] = False
+        # The cells of skipped components are weighed as unconstrained, but not shown as such
+        interior = int(unconstrained.sum())
+        for cells in skipped:
+            unconstrained[cells] = False
+
+        # prefix[i] and suffix[i] combine the bomb counts of the components before and from i on, with log scales
+        prefix = [(np.ones(1), 0.0)]
+        for component in solved:
+            poly, total = prefix[-1]
+            combined = np.convolve(poly, component.ways)
+            peak = combined.max() or 1.0
+            prefix.append((combined / peak, total + component.scale + math.log(peak)))
+        suffix = [(np.ones(1), 0.0)]
+        for component in reversed(solved):
+            poly, total = suffix[-1]
+            combined = np.convolve(poly, component.ways)
+            peak = combined.max() or 1.0
+            suffix.append((combined / peak, total + component.scale + math.log(peak)))
+        suffix.reverse()
+
+        # weight[k]: ways to put the other bombs into the interior when the frontier holds k bombs
+        full, _ = prefix[-1]
+        log_weights = np.array([logBinomial(interior, bomb_count - k) for k in range(len(full))])
+        possible = np.isfinite(log_weights) & (full > 0)
+        if not possible.any():
+            return probabilities
+        weights = np.zeros(len(full))
+        weights[possible] = np.exp(log_weights[possible] - log_weights[possible].max())
+        total = float((full * weights).sum())
+
+        if interior:
+            bombs_left = np.clip(bomb_count - np.arange(len(full)), 0, None)
+            flat[unconstrained] = float((full * weights * bombs_left).sum()) / interior / total
+
+        for i, component in enumerate(solved):
+            rest = np.convolve(prefix[i][0], suffix[i + 1][0])
+            # per bomb count of this component, the weight of everything outside of it
+            outside = np.correlate(weights, rest, mode="valid")[:len(component.ways)]
+            cell_probabilities = component.probabilities(outside, deadline)
+            if cell_probabilities is None:
+                skipped.append(component.order)
+            else:
+                flat[component.order] = cell_probabilities
+
+        last = self.last
+        if skipped and last is not None and last[0] == seed and last[1].shape == concealed.shape:
+            for cells in skipped:
+                flat[cells] = np.where(concealed.reshape(-1)[cells], last[1].reshape(-1)[cells], np.nan)
+        self.last = (seed, probabilities)
+        return probabilities
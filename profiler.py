@@ -0,0 +1,138 @@
+import functools
+import json
+import threading
+import time
+from collections import deque
+
+# Durations are bucketed by powers of two microseconds, bucket i holds [2**(i-1), 2**i) us
+BUCKETS = 32
+
+
+class Histogram:
+    """Call count, total, maximum and log2 buckets of the durations of one instrumented function"""
+    def __init__(self):
+        """Histogram init"""
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0]*BUCKETS
+
+    def add(self, duration: float):
+        """Adds a duration in seconds"""
+        self.count += 1
+        self.total += duration
+        if duration > self.max:
+            self.max = duration
+        self.buckets[min(int(duration * 1e6).bit_length(), BUCKETS - 1)] += 1
+
+    def percentile(self, fraction: float) -> float:
+        """Returns the upper bound in seconds of the bucket holding the given fraction of the calls"""
+        needed = fraction * self.count
+        seen = 0
+        for i, amount in enumerate(self.buckets):
+            seen += amount
+            if amount and seen >= needed:
+                return min(2**i / 1e6, self.max)
+        return self.max
+
+
+class Profiler:
+    """Times registered functions while enabled, by swapping in wrappers, so disabled it costs nothing"""
+    def __init__(self, max_events: int = 200000):
+        """Profiler init, keeps the latest max_events calls for the trace"""
+        self.enabled = False
+        self.targets = []
+        self.originals = []
+        self.max_events = max_events
+        self.reset()
+
+    def reset(self):
+        """Forgets every measurement"""
+        self.histograms = {}
+        self.counters = {}
+        # (label, start, end, thread id) of the latest calls
+        self.events = deque(maxlen = self.max_events)
+        self.origin = time.perf_counter()
+
+    def register(self, owner, attribute: str, label: str, count_result: bool = False):
+        """Registers a function of a class or module, count_result also sums the sizes of what it returns"""
+        self.targets.append((owner, attribute, label, count_result))
+
+    def enable(self):
+        """Starts a new session and wraps every registered function"""
+        if self.enabled:
+            return
+        self.reset()
+        for owner, attribute, label, count_result in self.targets:
+            original = owner.__dict__[attribute]
+            self.originals.append((owner, attribute, original))
+            setattr(owner, attribute, self.wrap(original, label, count_result))
+        self.enabled = True
+
+    def disable(self):
+        """Puts the original functions back, the measurements are kept for the overlay and the trace"""
+        if not self.enabled:
+            return
+        for owner, attribute, original in reversed(self.originals):
+            setattr(owner, attribute, original)
+        self.originals = []
+        self.enabled = False
+
+    def wrap(self, function, label: str, count_result: bool):
+        """Returns function timed under label"""
+        record = self.record
+        count = self.count
+
+        @functools.wraps(function)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                result = function(*args, **kwargs)
+            finally:
+                record(label, start, time.perf_counter())
+            if count_result and result is not None:
+                count(label + " cells", len(result))
+            return result
+        return timed
+
+    def record(self, label: str, start: float, end: float):
+        """Adds one timed span"""
+        histogram = self.histograms.get(label)
+        if histogram is None:
+            histogram = self.histograms[label] = Histogram()
+        histogram.add(end - start)
+        self.events.append((label, start, end, threading.get_ident()))
+
+    def count(self, label: str, amount: int = 1):
+        """Adds to a counter"""
+        self.counters[label] = self.counters.get(label, 0) + amount
+
+    def frame(self, dt: float):
+        """Records a frame that just ended and took dt seconds"""
+        if self.enabled:
+            end = time.perf_counter()
+            self.record("frame", end - dt, end)
+
+    def summary(self) -> str:
+        """Returns one line per measured function, slowest total first"""
+        lines = []
+        for label, histogram in sorted(self.histograms.items(), key = lambda item: -item[1].total):
+            lines.append(f"{label}: {histogram.count} calls, mean {histogram.total / histogram.count * 1000:.2f} ms, "
+                         f"p95 {histogram.percentile(0.95) * 1000:.2f} ms, max {histogram.max * 1000:.2f} ms")
+        for label, amount in sorted(self.counters.items()):
+            lines.append(f"{label}: {amount}")
+        return "\n".join(lines)
+
+    def exportTrace(self, path: str):
+        """Writes the recorded calls as Chrome trace JSON, viewable in chrome://tracing or Perfetto"""
+        origin = self.origin
+        events = [
+            {"name": label, "ph": "X", "pid": 1, "tid": thread,
+             "ts": (start - origin) * 1e6, "dur": (end - start) * 1e6}
+            for label, start, end, thread in self.events
+        ]
+        now = (time.perf_counter() - origin) * 1e6
+        events.extend({"name": label, "ph": "C", "pid": 1, "ts": now, "args": {"value": amount}}
+                      for label, amount in self.counters.items())
+        with open(path, "w") as file:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, file)
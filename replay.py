@@ -0,0 +1,152 @@
+import time
+import numpy as np
+from board import BoardModel
+
+# Replay files hold a header and then one record per action, integers are unsigned LEB128 varints
+#   header:  b"MSRP", version byte, layout byte, length and ASCII name of the topology, width, height, bomb_count,
+#            then the seed (layout 0) or the bit-packed bomb plane (layout 1)
+#   Version 1 headers have no topology, they are square Boards
+#   records: milliseconds since the previous action, x, y, action
+MAGIC = b"MSRP"
+VERSION = 2
+LAYOUT_SEED = 0
+LAYOUT_MINES = 1
+
+REVEAL = 0
+FLAG = 1
+CHORD = 2
+
+
+def encodeVarint(value: int) -> bytes:
+    """Encodes an unsigned integer as LEB128 varint"""
+    result = bytearray()
+    while value >= 0x80:
+        result.append((value & 0x7f) | 0x80)
+        value >>= 7
+    result.append(value)
+    return bytes(result)
+
+
+def decodeVarints(data: bytes) -> np.ndarray:
+    """Decodes every complete varint of a buffer at once, a trailing incomplete one is dropped"""
+    raw = np.frombuffer(data, dtype=np.uint8)
+    ends = np.flatnonzero(raw < 0x80)
+    if len(ends) == 0:
+        return np.zeros(0, dtype=np.uint64)
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    lengths = ends - starts + 1
+    values = np.zeros(len(ends), dtype=np.uint64)
+    for shift in range(int(lengths.max())):
+        has_byte = lengths > shift
+        chunk = (raw[starts[has_byte] + shift] & 0x7f).astype(np.uint64)
+        values[has_byte] |= chunk << np.uint64(7*shift)
+    return values
+
+
+def applyAction(model: BoardModel, action: int, x: int, y: int) -> set:
+    """Applies one recorded action to a Board Model, returns the changed cells"""
+    if action == REVEAL:
+        return model.reveal(x, y)
+    if action == FLAG:
+        return model.flag(x, y)
+    return model.chord(x, y)
+
+
+class GameRecorder:
+    """Streams the actions of one game to a replay file, every action is written as soon as it happens"""
+    def __init__(self, path: str, model: BoardModel, layout: int = LAYOUT_SEED, resume: bool = False):
+        """Game Recorder init, writes the header or with resume appends to an existing file"""
+        self.path = path
+        # unbuffered, so a killed app loses at most the action being written
+        self.file = open(path, "ab" if resume else "wb", buffering=0)
+        self.last_time = time.monotonic()
+        if resume:
+            return
+        header = bytearray(MAGIC)
+        header += bytes((VERSION, layout))
+        topology = model.topology_name.encode()
+        header += encodeVarint(len(topology)) + topology
+        header += encodeVarint(model.width) + encodeVarint(model.height) + encodeVarint(model.bomb_count)
+        if layout == LAYOUT_SEED:
+            header += encodeVarint(model.seed)
+        else:
+            header += np.packbits(model.mines).tobytes()
+        self.file.write(bytes(header))
+
+    def record(self, action: int, x: int, y: int):
+        """Appends one action with the time since the previous one"""
+        now = time.monotonic()
+        dt = int(round((now - self.last_time) * 1000))
+        self.last_time = now
+        self.file.write(encodeVarint(dt) + encodeVarint(x) + encodeVarint(y) + bytes((action,)))
+
+    def close(self):
+        """Closes the replay file"""
+        if not self.file.closed:
+            self.file.close()
+
+
+def readReplay(path: str):
+    """Reads a replay file, returns the header as dict and the records as (n, 4) array of dt, x, y, action"""
+    with open(path, "rb") as file:
+        data = file.read()
+    if data[:4] != MAGIC or data[4] not in (1, VERSION):
+        raise ValueError(f"{path} is not a version {VERSION} replay")
+    layout = data[5]
+    offset = 6
+    topology = "square"
+    if data[4] >= 2:
+        # names are short, so their length is a single varint byte
+        length = data[offset]
+        topology = data[offset + 1:offset + 1 + length].decode()
+        offset += 1 + length
+    values = decodeVarints(data[offset:offset + 30])
+    width, height, bomb_count = (int(value) for value in values[:3])
+    offset += sum(len(encodeVarint(value)) for value in (width, height, bomb_count))
+    header = {"width": width, "height": height, "bomb_count": bomb_count, "layout": layout, "topology": topology}
+    if layout == LAYOUT_SEED:
+        seed = int(decodeVarints(data[offset:offset + 10])[0])
+        header["seed"] = seed
+        offset += len(encodeVarint(seed))
+    else:
+        size = (width*height + 7) // 8
+        mines = np.unpackbits(np.frombuffer(data[offset:offset + size], dtype=np.uint8))[:width*height]
+        header["mines"] = mines.astype(bool).reshape((height, width))
+        offset += size
+    values = decodeVarints(data[offset:])
+    # A game cut off while writing leaves an incomplete record at the end
+    records = values[:len(values) // 4 * 4].reshape((-1, 4)).astype(np.int64)
+    return header, records
+
+
+def replayModel(header: dict) -> BoardModel:
+    """Builds the Board Model a replay starts from"""
+    model = BoardModel(header["width"], header["height"], header["bomb_count"], header.get("seed"), header["topology"])
+    if header["layout"] == LAYOUT_MINES:
+        model.setMines(header["mines"].copy())
+        model.first_reveal = False
+    return model
+
+
+class ReplayPlayer:
+    """Re-drives a recorded game on a Board Model, in real time, sped up or uncapped"""
+    def __init__(self, path: str):
+        """Replay Player init"""
+        self.header, self.records = readReplay(path)
+        self.model = replayModel(self.header)
+
+    def run(self, speed: float = None, on_change=None) -> BoardModel:
+        """Plays every action, waiting the recorded time divided by speed unless speed is None"""
+        model = self.model
+        start = time.monotonic()
+        elapsed = 0.0
+        for dt, x, y, action in self.records.tolist():
+            if speed is not None:
+                elapsed += dt / 1000 / speed
+                delay = start + elapsed - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+            changed = applyAction(model, action, x, y)
+            if on_change is not None:
+                on_change(changed)
+        return model
@@ -0,0 +1,83 @@
+import mmap
+import os
+import struct
+import numpy as np
+from board import BoardModel
+from topology import getTopology
+
+# Snapshot files hold a fixed little-endian header, the replay path and the bit-packed bomb, flag and revealed planes
+MAGIC = b"MSSV"
+VERSION = 3
+# version, width, height, init bomb count, bomb count, progress, flags remaining, first reveal, lost, seed,
+# elapsed seconds, topology name, practice Game, length of the replay path
+HEADER = struct.Struct("<4sBIIiiiiBBQd8sBH")
+
+
+def saveSnapshot(path: str, model: BoardModel, elapsed: float, replay_path: str = None, practice: bool = False):
+    """Writes the state of a running game, atomically replacing an older snapshot"""
+    replay = (replay_path or "").encode()
+    data = b"".join((
+        HEADER.pack(MAGIC, VERSION, model.width, model.height, model.init_bomb_count, model.bomb_count,
+                    model.progress, model.flags_remaining, model.first_reveal, model.lost, model.seed, elapsed,
+                    model.topology_name.encode(), practice, len(replay)),
+        replay,
+        np.packbits(model.mines).tobytes(),
+        np.packbits(model.flags).tobytes(),
+        np.packbits(model.revealed).tobytes(),
+    ))
+    # A killed process keeps what it handed to the OS, so the rename is enough to never leave a torn file
+    temporary = path + ".tmp"
+    with open(temporary, "wb") as file:
+        file.write(data)
+    os.replace(temporary, path)
+
+
+def loadSnapshot(path: str):
+    """Reads a snapshot through a memory map, returns it as dict or None if there is no valid one"""
+    try:
+        if os.path.getsize(path) < HEADER.size:
+            return None
+        file = open(path, "rb")
+    except OSError:
+        return None
+    with file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        (magic, version, width, height, init_bomb_count, bomb_count, progress, flags_remaining, first_reveal,
+         lost, seed, elapsed, topology, practice, replay_length) = HEADER.unpack_from(data)
+        cells = width*height
+        plane_size = (cells + 7) // 8
+        if magic != MAGIC or version != VERSION or len(data) != HEADER.size + replay_length + 3*plane_size:
+            return None
+        offset = HEADER.size + replay_length
+        replay_path = data[HEADER.size:offset].decode() or None
+        planes = []
+        for i in range(3):
+            packed = np.frombuffer(data, dtype=np.uint8, count=plane_size, offset=offset + i*plane_size)
+            planes.append(np.unpackbits(packed, count=cells).astype(bool).reshape((height, width)))
+            # the map can only be closed once no array looks into it anymore
+            del packed
+    return {
+        "width": width, "height": height, "init_bomb_count": init_bomb_count, "bomb_count": bomb_count,
+        "progress": progress, "flags_remaining": flags_remaining, "first_reveal": bool(first_reveal),
+        "lost": bool(lost), "seed": seed, "elapsed": elapsed, "replay_path": replay_path,
+        "topology": topology.rstrip(b"\0").decode(), "practice": bool(practice),
+        "mines": planes[0], "flags": planes[1], "revealed": planes[2],
+    }
+
+
+def restoreSnapshot(model: BoardModel, snapshot: dict):
+    """Puts the state of a snapshot into a Board Model, without placing bombs or revealing anything anew"""
+    model.width = snapshot["width"]
+    model.height = snapshot["height"]
+    model.init_bomb_count = snapshot["init_bomb_count"]
+    model.bomb_count = snapshot["bomb_count"]
+    model.progress = snapshot["progress"]
+    model.flags_remaining = snapshot["flags_remaining"]
+    model.first_reveal = snapshot["first_reveal"]
+    model.lost = snapshot["lost"]
+    model.seed = snapshot["seed"]
+    model.topology_name = snapshot["topology"]
+    model.topology = getTopology(model.topology_name, model.width, model.height)
+    model.flags = snapshot["flags"]
+    model.revealed = snapshot["revealed"]
+    # rebuilds the counts and the cascade buffer from the restored planes
+    model.setMines(snapshot["mines"])
@@ -0,0 +1,130 @@
+from board import BoardModel
+
+
+class HintSolver:
+    """Deduces certainly safe cells and certain bombs from the revealed numbers of a Board Model"""
+    def __init__(self, model: BoardModel):
+        """Hint Solver init"""
+        self.model = model
+        self.reset()
+
+    def reset(self):
+        """Forgets every deduction, e.g. after a restart"""
+        # deduced bombs and deduced safe cells that are still concealed
+        self.mines = set()
+        self.safe = set()
+        # revealed cells whose constraint has to be re-examined
+        self.dirty = set()
+        # constraints the single rules could not decide since the last pair pass
+        self.stalled = set()
+
+    def checkpoint(self):
+        """Returns a copy of every deduction and pending constraint, see restore"""
+        return (set(self.mines), set(self.safe), set(self.dirty), set(self.stalled))
+
+    def restore(self, checkpoint):
+        """Continues from a checkpoint, the Board Model may have revealed more cells since"""
+        self.mines, self.safe, self.dirty, self.stalled = (set(cells) for cells in checkpoint)
+
+    def update(self, changed):
+        """Marks the constraints around the changed cells for re-examination, nothing else is ever rescanned"""
+        model = self.model
+        for x, y in changed:
+            self.safe.discard((x, y))
+            if model.revealed[y, x]:
+                self.dirty.add((x, y))
+            for nx, ny in model.neighbours(x, y):
+                if model.revealed[ny, nx]:
+                    self.dirty.add((nx, ny))
+
+    def constraint(self, x: int, y: int):
+        """Returns the undecided neighbours of a revealed cell and the amount of bombs among them"""
+        model = self.model
+        unknown = []
+        remaining = int(model.counts[y, x])
+        for cell in model.neighbours(x, y):
+            if cell in self.mines:
+                remaining -= 1
+            elif not model.revealed[cell[1], cell[0]] and cell not in self.safe:
+                unknown.append(cell)
+        return unknown, remaining
+
+    def decide(self, cells, is_mine: bool):
+        """Stores deduced cells and marks the constraints around them"""
+        model = self.model
+        target = self.mines if is_mine else self.safe
+        for cell in cells:
+            target.add(cell)
+            for nx, ny in model.neighbours(*cell):
+                if model.revealed[ny, nx]:
+                    self.dirty.add((nx, ny))
+
+    def propagate(self):
+        """Applies the single constraint rules to every marked constraint until nothing changes"""
+        while self.dirty:
+            x, y = self.dirty.pop()
+            unknown, remaining = self.constraint(x, y)
+            if not unknown:
+                self.stalled.discard((x, y))
+            elif remaining == 0:
+                self.decide(unknown, False)
+            elif remaining == len(unknown):
+                self.decide(unknown, True)
+            else:
+                self.stalled.add((x, y))
+
+    def pairRule(self) -> bool:
+        """Compares every stalled constraint with the constraints it overlaps, returns if anything was decided"""
+        model = self.model
+        found = False
+        stalled = self.stalled
+        self.stalled = set()
+        for a in stalled:
+            unknown_a, remaining_a = self.constraint(*a)
+            if not unknown_a:
+                continue
+            set_a = set(unknown_a)
+            others = set()
+            for cell in unknown_a:
+                for nx, ny in model.neighbours(*cell):
+                    if model.revealed[ny, nx] and (nx, ny) != a:
+                        others.add((nx, ny))
+            for b in others:
+                unknown_b, remaining_b = self.constraint(*b)
+                if not unknown_b:
+                    continue
+                set_b = set(unknown_b)
+                only_a = set_a - set_b
+                only_b = set_b - set_a
+                # A - B holds remaining_a - remaining_b more bombs than B - A, if that is all of A - B, B - A is safe
+                if remaining_a - remaining_b == len(only_a):
+                    decided = (only_a, only_b)
+                elif remaining_b - remaining_a == len(only_b):
+                    decided = (only_b, only_a)
+                else:
+                    continue
+                if decided[0] or decided[1]:
+                    self.decide(decided[0], True)
+                    self.decide(decided[1], False)
+                    found = True
+                    break
+        return found
+
+    def solve(self):
+        """Propagates the marked constraints, escalating to pairs when stalled. Returns the safe cells and bombs"""
+        while True:
+            self.propagate()
+            if not self.stalled or not self.pairRule():
+                break
+        return self.safe, self.mines
+
+    def hint(self):
+        """Returns a deduced (x, y, is_mine) move the player has not made yet or None"""
+        safe, mines = self.solve()
+        if safe:
+            x, y = min(safe)
+            return (x, y, False)
+        for x, y in sorted(mines):
+            if not self.model.flags[y, x]:
+                return (x, y, True)
+        return None
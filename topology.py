@@ -0,0 +1,132 @@
+from array import array
+from functools import lru_cache
+import numpy as np
+
+SQUARE_OFFSETS = ((-1, -1), (0, -1), (1, -1), (-1, 0), (1, 0), (-1, 1), (0, 1), (1, 1))
+KNIGHT_OFFSETS = ((-1, -2), (1, -2), (-2, -1), (2, -1), (-2, 1), (2, 1), (-1, 2), (1, 2))
+# Hexagonal cells in offset rows, every odd row is shifted half a cell to the right
+HEX_EVEN_OFFSETS = ((-1, -1), (0, -1), (-1, 0), (1, 0), (-1, 1), (0, 1))
+HEX_ODD_OFFSETS = ((0, -1), (1, -1), (-1, 0), (1, 0), (0, 1), (1, 1))
+
+
+def countNeighbours(plane: np.ndarray) -> np.ndarray:
+    """Counts the set cells around every cell of a boolean plane or a stack of planes (3x3 convolution without the center)"""
+    height, width = plane.shape[-2:]
+    padded = np.zeros(plane.shape[:-2] + (height + 2, width + 2), dtype=np.int8)
+    padded[..., 1:-1, 1:-1] = plane
+    counts = np.zeros(plane.shape, dtype=np.int8)
+    for dy in range(3):
+        for dx in range(3):
+            if dy == 1 and dx == 1:
+                continue
+            counts += padded[..., dy:dy + height, dx:dx + width]
+    return counts
+
+
+def neighbourTable(width: int, height: int, offsets, wrap: bool = False, odd_offsets=None):
+    """Returns the CSR neighbour table (indptr, indices) of a Board whose cells reach the (dx, dy) offsets
+
+    With wrap the Board is a torus, otherwise offsets leaving it are dropped. odd_offsets replace the offsets on odd
+    rows. Every cell lists each neighbour once in ascending order and never itself.
+    """
+    cells = width*height
+    ys, xs = np.divmod(np.arange(cells), width)
+    targets = []
+    for even, odd in zip(offsets, odd_offsets or offsets):
+        dx = np.where(ys % 2 == 1, odd[0], even[0])
+        dy = np.where(ys % 2 == 1, odd[1], even[1])
+        nx = xs + dx
+        ny = ys + dy
+        if wrap:
+            nx %= width
+            ny %= height
+            inside = np.ones(cells, dtype=bool)
+        else:
+            inside = (nx >= 0) & (nx < width) & (ny >= 0) & (ny < height)
+        targets.append(np.where(inside, ny*width + nx, -1))
+    # (cells, offsets), sorted so that cells a small torus reaches twice are next to each other
+    targets = np.sort(np.stack(targets, axis=1), axis=1)
+    targets[targets == np.arange(cells)[:, None]] = -1
+    targets[:, 1:][targets[:, 1:] == targets[:, :-1]] = -1
+    valid = targets >= 0
+    indptr = np.zeros(cells + 1, dtype=np.intp)
+    np.cumsum(valid.sum(axis=1), out=indptr[1:])
+    return indptr, targets[valid]
+
+
+class Topology:
+    """Neighbourhood of every cell of one Board size as a CSR table, built once per Board
+
+    The neighbours of flat cell i = y*width + x are indices[indptr[i]:indptr[i + 1]]. stagger is the share of a cell
+    every odd row is drawn shifted to the right.
+    """
+    def __init__(self, name: str, width: int, height: int, indptr: np.ndarray, indices: np.ndarray, stagger: float = 0.0):
+        """Topology init"""
+        self.name = name
+        self.width = width
+        self.height = height
+        self.indptr = indptr
+        self.indices = indices
+        self.stagger = stagger
+        # Python copies for the cascade, which walks the table one cell at a time
+        self.starts = indptr.tolist()
+        self.flat = array("i")
+        self.flat.frombytes(indices.astype(np.int32).tobytes())
+
+    def neighbours(self, x: int, y: int):
+        """Returns the (x, y) indices around a cell"""
+        i = y*self.width + x
+        width = self.width
+        return [(j % width, j // width) for j in self.flat[self.starts[i]:self.starts[i + 1]]]
+
+    def countAround(self, plane: np.ndarray, x: int, y: int) -> int:
+        """Returns the amount of set cells around one cell of a boolean plane, as one gather"""
+        i = y*self.width + x
+        return int(plane.reshape(-1)[self.indices[self.indptr[i]:self.indptr[i + 1]]].sum())
+
+    def count(self, plane: np.ndarray) -> np.ndarray:
+        """Counts the set cells around every cell of a boolean plane or a stack of planes"""
+        if self.name == "square":
+            # The same counts, a shifted sum is faster than the gather for the plain neighbourhood
+            return countNeighbours(plane)
+        gathered = plane.reshape(plane.shape[:-2] + (-1,))[..., self.indices]
+        sums = np.zeros(plane.shape[:-2] + (len(self.indices) + 1,), dtype=np.int32)
+        np.cumsum(gathered, axis=-1, out=sums[..., 1:])
+        counts = sums[..., self.indptr[1:]] - sums[..., self.indptr[:-1]]
+        return counts.astype(np.int8).reshape(plane.shape)
+
+
+def squareTopology(width: int, height: int) -> Topology:
+    """The classic Board, every cell touches the eight cells around it"""
+    return Topology("square", width, height, *neighbourTable(width, height, SQUARE_OFFSETS))
+
+
+def torusTopology(width: int, height: int) -> Topology:
+    """A square Board whose edges wrap around, every cell has eight neighbours"""
+    return Topology("torus", width, height, *neighbourTable(width, height, SQUARE_OFFSETS, wrap=True))
+
+
+def hexTopology(width: int, height: int) -> Topology:
+    """Hexagonal cells in offset rows, every cell touches six cells"""
+    indptr, indices = neighbourTable(width, height, HEX_EVEN_OFFSETS, odd_offsets=HEX_ODD_OFFSETS)
+    return Topology("hex", width, height, indptr, indices, stagger=0.5)
+
+
+def knightTopology(width: int, height: int) -> Topology:
+    """Every cell counts the bombs a chess knight on it could reach"""
+    return Topology("knight", width, height, *neighbourTable(width, height, KNIGHT_OFFSETS))
+
+
+# Builders of the selectable Board topologies by name, snapshots and replays store only the name
+TOPOLOGIES = {
+    "square": squareTopology,
+    "torus": torusTopology,
+    "hex": hexTopology,
+    "knight": knightTopology,
+}
+
+
+@lru_cache(maxsize=8)
+def getTopology(name: str, width: int, height: int) -> Topology:
+    """Returns the Topology of a Board, building its table only once per size"""
+    return TOPOLOGIES[name](width, height)